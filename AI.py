@@ -0,0 +1,277 @@
+from collections import deque
+from time import perf_counter_ns
+
+from Dungeon import *
+from Spatial import NeighbourGrid
+
+ACTIVATION_RADIUS = 500   # Enemies notice the player within this many pixels, given line of sight
+LOSE_INTEREST_TIME = 3.0  # Seconds out of sight before an awake enemy goes dormant again
+BOSS_STRAFE_RANGE = 160   # Bosses circle the player inside this range instead of closing in
+BOSS_ORBIT_RADIUS = 120   # Distance a strafing boss keeps from the player
+
+# Neighbour cells as (dcol, drow), orthogonal first so ties prefer straight moves
+STEPS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+class FlowField:
+    """Walking distance, in cells, from the player to every free cell of a room.
+
+    Filled breadth-first a slice at a time, into a second buffer while the
+    last complete field stays in use, so the player moving never leaves
+    enemies without directions.
+    """
+    replan_cells = 2  # Start a new fill once the player is this many cells from the origin
+
+    def __init__(self, occupancy: OccupancyGrid, size: float):
+        self.occupancy = occupancy
+        self.free_rows = occupancy.free_rows(size)
+        self.cols = occupancy.cols
+        self.size = size
+        self.distance: Optional[List[int]] = None  # Last complete fill
+        self.building: Optional[List[int]] = None
+        self.frontier: Deque[int] = deque()
+        self.origin: Optional[Tuple[int, int]] = None
+        self.fills = 0
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        cell_size = self.occupancy.cell_size
+        return int(x // cell_size), int(y // cell_size)
+
+    def _free(self, col: int, row: int) -> bool:
+        return 0 <= col < self.cols and 0 <= row < self.occupancy.rows and bool(self.free_rows[row] >> col & 1)
+
+    def retarget(self, x: float, y: float):
+        """Start a new fill from (x, y) if it has moved far enough from the last one."""
+        col, row = self._cell(x, y)
+        if self.origin is not None and max(abs(col - self.origin[0]), abs(row - self.origin[1])) < self.replan_cells:
+            return
+        if not self._free(col, row):
+            # The player's center can sit closer to a wall than an enemy fits
+            position = self.occupancy.nearest_free_position(x, y, self.size)
+            if position is None:
+                return
+            col, row = self._cell(*position)
+        self.origin = (col, row)
+        self.building = [-1] * (self.cols * self.occupancy.rows)
+        self.building[row * self.cols + col] = 0
+        self.frontier = deque([row * self.cols + col])
+
+    def expand(self, cells: int):
+        """Visit up to cells more cells of the fill in progress."""
+        building = self.building
+        if building is None:
+            return
+        frontier = self.frontier
+        cols = self.cols
+        free_rows = self.free_rows
+        rows = self.occupancy.rows
+        for _ in range(cells):
+            if not frontier:
+                self.distance = building
+                self.building = None
+                self.fills += 1
+                return
+            index = frontier.popleft()
+            row, col = divmod(index, cols)
+            next_distance = building[index] + 1
+            for dcol, drow in STEPS[:4]:
+                other_col = col + dcol
+                other_row = row + drow
+                if 0 <= other_col < cols and 0 <= other_row < rows and free_rows[other_row] >> other_col & 1:
+                    other = other_row * cols + other_col
+                    if building[other] < 0:
+                        building[other] = next_distance
+                        frontier.append(other)
+
+    def next_step(self, x: float, y: float) -> Optional[Tuple[int, int]]:
+        """Center of the neighbouring cell one step closer to the player, if known."""
+        if self.distance is None:
+            return None
+        col, row = self._cell(x, y)
+        if not self._free(col, row):
+            return None
+        best = self.distance[row * self.cols + col]
+        if best < 0:
+            return None
+        step = None
+        for dcol, drow in STEPS:
+            other_col = col + dcol
+            other_row = row + drow
+            if not self._free(other_col, other_row):
+                continue
+            # No cutting corners past a wall
+            if dcol and drow and not (self._free(col + dcol, row) and self._free(col, row + drow)):
+                continue
+            distance = self.distance[other_row * self.cols + other_col]
+            if 0 <= distance < best:
+                best = distance
+                step = (other_col, other_row)
+        return self.occupancy.cell_center(*step) if step else None
+
+class AIScheduler:
+    """Runs enemy decisions for the player's room under a per-frame budget.
+
+    A decision is the expensive part: the wake/sleep check with its line of
+    sight test, picking a waypoint from the room's flow field, and a boss's
+    choice of tactic and bullet pattern. Each enemy is due for one every so often, sooner the
+    closer it is to the player; due enemies are served nearest first until
+    the budget runs out and the rest wait for the next frame. In between,
+    enemies keep carrying out their last decision every tick, which is only
+    a few multiplications.
+    """
+    think_interval = 0.1     # Seconds between decisions of an enemy next to the player
+    distance_interval = 1.0  # Extra seconds between decisions per 1000 pixels of distance
+    dormant_interval = 1 / 6 # Seconds between a dormant enemy's wake checks
+    overdue_weight = 2000    # Pixels of distance a second of waiting makes up for
+    separation = 0.5         # Share of an overlap between two enemies each resolves per tick
+
+    def __init__(self, budget_us: int = 400):
+        self.budget_us = budget_us
+        self.time = 0.0
+        self.room: Optional[Room] = None
+        self.field: Optional[FlowField] = None
+        self.decisions = 0  # Decisions made in the last update
+        self.deferred = 0   # Enemies that were due but had to wait
+        self.used_us = 0    # Microseconds spent in the last update
+        self.neighbours = NeighbourGrid(64)  # Cells at least as big as the largest enemy
+        self.neighbour_checks = 0  # Enemy pairs looked at by the last separate()
+
+    def update(self, room: Room, player: Player, visibility: VisibilityMap, dt: float):
+        self.time += dt
+        start = perf_counter_ns()
+        deadline = start + self.budget_us * 1000
+        if room is not self.room or self.field is None or self.field.occupancy is not room.occupancy:
+            # A new room, or the old one's grid was released and rebuilt
+            self.room = room
+            self.field = FlowField(room.occupancy, 32)
+        self.field.retarget(player.x, player.y)
+
+        due = []
+        for enemy in room.enemies:
+            if enemy.health > 0 and enemy.next_think <= self.time:
+                distance = sqrt((player.x - enemy.x) ** 2 + (player.y - enemy.y) ** 2)
+                due.append((distance - (self.time - enemy.next_think) * self.overdue_weight, distance, enemy))
+        due.sort(key=lambda item: item[0])
+
+        self.decisions = 0
+        for _, distance, enemy in due:
+            # Always make one decision, so a tiny budget still makes progress
+            if self.decisions and perf_counter_ns() >= deadline:
+                break
+            self._think(enemy, room, player, visibility, distance)
+            self.decisions += 1
+        self.deferred = len(due) - self.decisions
+
+        # Whatever is left goes to the flow field, a minimum slice regardless
+        while True:
+            self.field.expand(64)
+            if self.field.building is None or perf_counter_ns() >= deadline:
+                break
+        self.used_us = (perf_counter_ns() - start) // 1000
+
+    def _think(self, enemy: Enemy, room: Room, player: Player, visibility: VisibilityMap, distance: float):
+        elapsed = self.time - enemy.last_think if enemy.last_think is not None else 0.0
+        enemy.last_think = self.time
+        if not enemy.awake:
+            enemy.next_think = self.time + self.dormant_interval
+            if (distance <= ACTIVATION_RADIUS and
+                    visibility.has_line_of_sight(enemy.x, enemy.y, room.wall_index)):
+                enemy.wake()
+            else:
+                return
+            visible = True
+        elif distance > ACTIVATION_RADIUS * 1.5:
+            enemy.awake = False
+            enemy.next_think = self.time + self.dormant_interval
+            return
+        else:
+            visible = visibility.has_line_of_sight(enemy.x, enemy.y, room.wall_index)
+            if visible:
+                enemy.unseen_time = 0.0
+            else:
+                enemy.unseen_time += elapsed
+                if enemy.unseen_time > LOSE_INTEREST_TIME:
+                    enemy.awake = False
+                    enemy.next_think = self.time + self.dormant_interval
+                    return
+
+        enemy.next_think = self.time + self.think_interval + distance / 1000 * self.distance_interval
+        if visible:
+            # Straight at the player; the tick re-aims at where they are now
+            enemy.waypoint = None
+        else:
+            enemy.waypoint = self.field.next_step(enemy.x, enemy.y)
+        if enemy.is_boss:
+            enemy.tactic = "strafe" if visible and distance < BOSS_STRAFE_RANGE else "chase"
+            # Only shoot at a player it can see: rings up close, spirals once hurt, aimed fans otherwise
+            if not visible:
+                enemy.pattern = None
+            elif enemy.tactic == "strafe":
+                enemy.pattern = "ring"
+            elif enemy.health < enemy.max_health / 2:
+                enemy.pattern = "spiral"
+            else:
+                enemy.pattern = "aimed"
+
+    def act(self, enemy: Enemy, room: Room, player: Player):
+        """Carry out the enemy's last decision for one tick."""
+        if enemy.waypoint is not None:
+            if enemy.move_toward(enemy.waypoint[0], enemy.waypoint[1], room.wall_index):
+                # Reached it: ask for the next one as soon as there is budget
+                enemy.waypoint = None
+                enemy.next_think = self.time
+        elif enemy.tactic == "strafe":
+            # Around the player, plus in or out by however far it is off the orbit
+            dx = player.x - enemy.x
+            dy = player.y - enemy.y
+            distance = sqrt(dx * dx + dy * dy)
+            if distance == 0:
+                dx, distance = 1.0, 1.0
+            radial = (distance - BOSS_ORBIT_RADIUS) / distance
+            enemy.move_toward(enemy.x - dy + dx * radial, enemy.y + dx + dy * radial, room.wall_index)
+        else:
+            enemy.move_toward(player.x, player.y, room.wall_index)
+
+    def separate(self, room: Room):
+        """Push overlapping enemies apart so crowds spread around the player
+        instead of stacking on one spot. Only awake enemies move; dormant ones
+        are obstacles."""
+        enemies = [enemy for enemy in room.enemies if enemy.health > 0]
+        self.neighbours.rebuild(enemies)
+        self.neighbour_checks = 0
+        walls = room.wall_index
+        for enemy in enemies:
+            if not enemy.awake:
+                continue
+            push_x = push_y = 0.0
+            for other in self.neighbours.near(enemy.x, enemy.y):
+                if other is enemy:
+                    continue
+                self.neighbour_checks += 1
+                dx = enemy.x - other.x
+                dy = enemy.y - other.y
+                min_distance = (enemy.size + other.size) / 2
+                distance_sq = dx * dx + dy * dy
+                if distance_sq >= min_distance * min_distance:
+                    continue
+                if distance_sq == 0:
+                    # Exactly on top of each other: split along x, in opposite directions
+                    dx, distance = (1.0 if enemy.spawn_id >= other.spawn_id else -1.0), 1.0
+                else:
+                    distance = sqrt(distance_sq)
+                share = (min_distance - distance) * self.separation / distance
+                push_x += dx * share
+                push_y += dy * share
+
+            if push_x or push_y:
+                # Never faster than walking, so a dense crowd settles instead of jittering
+                length = sqrt(push_x * push_x + push_y * push_y)
+                if length > enemy.speed:
+                    push_x = push_x / length * enemy.speed
+                    push_y = push_y / length * enemy.speed
+                half = enemy.size / 2
+                for move_x, move_y in ((push_x, push_y), (push_x, 0), (0, push_y)):
+                    rect = pygame.Rect(enemy.x + move_x - half, enemy.y + move_y - half, enemy.size, enemy.size)
+                    if not walls.collides(rect):
+                        enemy.x += move_x
+                        enemy.y += move_y
+                        break
@@ -0,0 +1,68 @@
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+import pygame
+
+FLOOR_SHEET = "tiles/floor.png"
+FEAT_SHEET = "tiles/feat.png"
+EFFECT_SHEET = "tiles/player.png"
+PLAYER_SHEET = "sprites/characters/player.png"
+ENEMY_SHEET = "sprites/characters/32x32/Char_006.png"
+
+# Everything the game draws from, in the order it is first needed
+ALL_SHEETS = [FLOOR_SHEET, PLAYER_SHEET, ENEMY_SHEET, EFFECT_SHEET, FEAT_SHEET]
+
+class AssetLoader:
+    """Decodes image files on a thread pool and hands out shared, converted surfaces.
+
+    pygame releases the GIL while it reads and decodes a file, so decodes
+    run in parallel with each other and with the game loop. convert_alpha
+    needs the display and always runs on the main thread, in get() or poll().
+    The pool is started by the first request, so importing this module does
+    not leave threads running in tools that never load an image.
+    """
+    def __init__(self, workers: int = min(4, os.cpu_count() or 1)):
+        self.workers = workers
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.decoding: Dict[str, Future] = {}
+        self.images: Dict[str, pygame.Surface] = {}
+
+    def request(self, path: str) -> Future:
+        """Start decoding path if nothing has asked for it yet."""
+        future = self.decoding.get(path)
+        if future is None:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="assets")
+            future = self.executor.submit(pygame.image.load, path)
+            self.decoding[path] = future
+        return future
+
+    def prefetch(self, paths: Iterable[str]):
+        for path in paths:
+            if path not in self.images:
+                self.request(path)
+
+    def ready(self, path: str) -> bool:
+        """True once get(path) would not block."""
+        return path in self.images or (path in self.decoding and self.decoding[path].done())
+
+    def get(self, path: str) -> pygame.Surface:
+        """The converted surface for path, waiting for its decode if needed. Shared: do not draw on it."""
+        image = self.images.get(path)
+        if image is None:
+            image = self.request(path).result().convert_alpha()
+            self.images[path] = image
+            del self.decoding[path]
+        return image
+
+    def poll(self):
+        """Convert whatever finished decoding since the last call. Main thread only."""
+        for path in [path for path, future in self.decoding.items() if future.done()]:
+            self.get(path)
+
+    def image_bytes(self) -> int:
+        return sum(image.get_width() * image.get_height() * image.get_bytesize()
+                   for image in self.images.values())
+
+assets = AssetLoader()
@@ -0,0 +1,157 @@
+from array import array
+from math import atan2, cos, pi, sin
+from typing import Dict, Tuple
+
+from Spatial import WallIndex
+
+class BulletField:
+    """Every live enemy bullet, stored as parallel arrays (one per field)
+    rather than one object per bullet.
+
+    Each bullet is raycast against the walls once when it is fired, which
+    turns its wall hit into a lifetime in ticks; after that a tick is a
+    position add, a countdown and a box test against the player's hitbox.
+    Dead bullets are swapped with the last live one, so the live ones are
+    always the first count entries and nothing is allocated while playing.
+    """
+    radius = 4         # Half-size of a bullet, for walls and the player
+    player_hitbox = 8  # Half-size of the player as far as bullets are concerned
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self.count = 0
+        self.x = array('f', bytes(4 * capacity))
+        self.y = array('f', bytes(4 * capacity))
+        self.vx = array('f', bytes(4 * capacity))
+        self.vy = array('f', bytes(4 * capacity))
+        self.life = array('H', bytes(2 * capacity))    # Ticks until it hits a wall or expires
+        self.damage = array('H', bytes(2 * capacity))
+        self.dropped = 0  # Bullets not fired because the field was full, all time
+
+    def spawn(self, x: float, y: float, angle: float, speed: float, damage: int,
+              walls: WallIndex, max_range: float = 1200, clearance: float = 0.0):
+        """Fire from (x, y), starting clearance pixels out so a shooter's own body is cleared."""
+        if self.count == self.capacity:
+            self.dropped += 1
+            return
+        dx = cos(angle)
+        dy = sin(angle)
+        # Cast from (x, y) itself, so a shooter against a wall can't fire through it
+        ticks = int((walls.raycast((x, y), (dx, dy), max_range, self.radius) - clearance) / speed)
+        if ticks <= 0:
+            return
+        i = self.count
+        self.x[i] = x + dx * clearance
+        self.y[i] = y + dy * clearance
+        self.vx[i] = dx * speed
+        self.vy[i] = dy * speed
+        self.life[i] = min(ticks, 0xFFFF)
+        self.damage[i] = damage
+        self.count += 1
+
+    def update(self, target_x: float, target_y: float) -> int:
+        """Advance every bullet one tick. Returns the damage dealt to a player at the target."""
+        # Locals, since this runs for every bullet every tick
+        xs, ys, vxs, vys, life, damage = self.x, self.y, self.vx, self.vy, self.life, self.damage
+        reach = self.player_hitbox + self.radius
+        dealt = 0
+        count = self.count
+        i = 0
+        while i < count:
+            remaining = life[i] - 1
+            x = xs[i] + vxs[i]
+            y = ys[i] + vys[i]
+            hit = -reach < x - target_x < reach and -reach < y - target_y < reach
+            if hit:
+                dealt += damage[i]
+            if hit or remaining == 0:
+                count -= 1
+                xs[i] = xs[count]
+                ys[i] = ys[count]
+                vxs[i] = vxs[count]
+                vys[i] = vys[count]
+                life[i] = life[count]
+                damage[i] = damage[count]
+                continue
+            xs[i] = x
+            ys[i] = y
+            life[i] = remaining
+            i += 1
+        self.count = count
+        return dealt
+
+    def clear(self):
+        self.count = 0
+
+    def nbytes(self) -> int:
+        return sum(column.buffer_info()[1] * column.itemsize
+                   for column in (self.x, self.y, self.vx, self.vy, self.life, self.damage))
+
+class Emitter:
+    """Fires a pattern of bullets every interval seconds while it is the active one."""
+    def __init__(self, interval: float, speed: float, damage: int):
+        self.interval = interval
+        self.speed = speed
+        self.damage = damage
+        self.timer = 0.0
+
+    def update(self, dt: float, field: BulletField, origin: Tuple[float, float],
+               target: Tuple[float, float], walls: WallIndex, clearance: float = 0.0):
+        self.timer += dt
+        while self.timer >= self.interval:
+            self.timer -= self.interval
+            self.fire(field, origin, target, walls, clearance)
+
+    def fire(self, field: BulletField, origin: Tuple[float, float],
+             target: Tuple[float, float], walls: WallIndex, clearance: float):
+        raise NotImplementedError
+
+class Ring(Emitter):
+    """count bullets evenly around the origin, rotated a little every volley."""
+    def __init__(self, count: int, interval: float = 0.8, speed: float = 3, damage: int = 4):
+        super().__init__(interval, speed, damage)
+        self.count = count
+        self.offset = 0.0
+
+    def fire(self, field, origin, target, walls, clearance):
+        step = 2 * pi / self.count
+        for i in range(self.count):
+            field.spawn(origin[0], origin[1], self.offset + i * step, self.speed, self.damage, walls,
+                        clearance=clearance)
+        self.offset += step / 2
+
+class Spiral(Emitter):
+    """arms streams of bullets turning by turn radians per shot."""
+    def __init__(self, arms: int, turn: float = 0.25, interval: float = 0.06, speed: float = 3.5, damage: int = 3):
+        super().__init__(interval, speed, damage)
+        self.arms = arms
+        self.turn = turn
+        self.angle = 0.0
+
+    def fire(self, field, origin, target, walls, clearance):
+        for arm in range(self.arms):
+            field.spawn(origin[0], origin[1], self.angle + arm * 2 * pi / self.arms,
+                        self.speed, self.damage, walls, clearance=clearance)
+        self.angle += self.turn
+
+class AimedBurst(Emitter):
+    """A fan of count bullets spread radians wide, centered on the target."""
+    def __init__(self, count: int, spread: float = 0.5, interval: float = 1.0, speed: float = 5, damage: int = 6):
+        super().__init__(interval, speed, damage)
+        self.count = count
+        self.spread = spread
+
+    def fire(self, field, origin, target, walls, clearance):
+        aim = atan2(target[1] - origin[1], target[0] - origin[0])
+        for i in range(self.count):
+            offset = self.spread * (i / (self.count - 1) - 0.5) if self.count > 1 else 0.0
+            field.spawn(origin[0], origin[1], aim + offset, self.speed, self.damage, walls,
+                        clearance=clearance)
+
+def boss_patterns(floor: int) -> Dict[str, Emitter]:
+    """A boss's emitters by pattern name, denser on later floors."""
+    return {
+        "ring": Ring(12 + 6 * floor),
+        "spiral": Spiral(2 + floor),
+        "aimed": AimedBurst(3 + 2 * floor),
+    }
@@ -0,0 +1,33 @@
+from dataclasses import dataclass, field
+
+
+@dataclass
+class RoomConfig:
+    width: int = 1200
+    height: int = 1200
+    num_obstacles: int = 15
+    min_enemies: int = 2
+    max_enemies: int = 4
+
+@dataclass
+class FloorConfig:
+    first_floor_size: int = 4  # Rooms on floor 1
+    floor_size: int = 8        # Rooms on every later floor
+    num_floors: int = 3
+    room: RoomConfig = field(default_factory=RoomConfig)
+
+PRESETS = {
+    "default": FloorConfig(),
+    # Bigger content we might actually ship
+    "large": FloorConfig(
+        first_floor_size=40,
+        floor_size=80,
+        room=RoomConfig(width=2400, height=2400, num_obstacles=150, min_enemies=8, max_enemies=16)
+    ),
+    # Deliberately past anything we plan to ship, to find where the engine breaks down
+    "stress": FloorConfig(
+        first_floor_size=300,
+        floor_size=500,
+        room=RoomConfig(width=6000, height=6000, num_obstacles=2000, min_enemies=100, max_enemies=200)
+    ),
+}
@@ -0,0 +1,178 @@
+from collections import deque
+from dataclasses import field
+import tracemalloc
+
+from Dungeon import *
+
+
+@dataclass
+class ControllerInput:
+    dx: float = 0
+    dy: float = 0
+    abilities: List[str] = field(default_factory=list)
+    facing: Optional[float] = None  # Overrides the movement direction when set
+
+class Controller:
+    """Decides what the player does each frame. Game.handle_input applies the result."""
+    def get_input(self, game) -> ControllerInput:
+        raise NotImplementedError
+
+class KeyboardController(Controller):
+    def get_input(self, game) -> ControllerInput:
+        keys = pygame.key.get_pressed()
+
+        command = ControllerInput(
+            dx=keys[pygame.K_RIGHT] - keys[pygame.K_LEFT],
+            dy=keys[pygame.K_DOWN] - keys[pygame.K_UP]
+        )
+        if keys[pygame.K_1]:
+            command.abilities.append("aoe")
+        if keys[pygame.K_2]:
+            command.abilities.append("cone")
+        if keys[pygame.K_3]:
+            command.abilities.append("projectile")
+        return command
+
+class BotController(Controller):
+    """Plays the game on its own: clears rooms, grabs power-ups and takes the stairs."""
+    def __init__(self):
+        self.last_pos = None
+        self.stuck_frames = 0
+        self.detour_frames = 0
+        self.detour = (0, 0)
+
+    def get_input(self, game) -> ControllerInput:
+        player = game.player
+        room = game.dungeon.rooms[game.dungeon.current_room_pos]
+        command = ControllerInput()
+
+        target = self._nearest(player, room.enemies)
+        if target:
+            # Fight: close in, keep facing the enemy and use whatever is ready
+            dx = target.x - player.x
+            dy = target.y - player.y
+            distance = sqrt(dx * dx + dy * dy)
+            command.facing = atan2(dy, dx)
+            if distance <= player.abilities["aoe"].range * 0.8:
+                command.abilities.append("aoe")
+            if distance <= player.abilities["cone"].range * 0.8:
+                command.abilities.append("cone")
+            if distance <= player.abilities["projectile"].range:
+                command.abilities.append("projectile")
+            if distance > 80:
+                command.dx, command.dy = self._steer(player, target.x, target.y)
+            return command
+
+        power_up = self._nearest(player, room.power_ups)
+        if power_up:
+            command.dx, command.dy = self._steer(player, power_up.x, power_up.y)
+            return command
+
+        if game.dungeon.floor_completed and room.room_type == RoomType.BOSS and room.boss_defeated:
+            command.dx, command.dy = self._steer(player, room.width // 2, room.height // 2)
+            return command
+
+        direction = self._next_door(game)
+        if direction:
+            command.dx, command.dy = self._steer(player, *self._door_target(player, room, direction))
+        return command
+
+    def _nearest(self, player: Player, things: list):
+        best = None
+        best_distance = None
+        for thing in things:
+            distance = (thing.x - player.x) ** 2 + (thing.y - player.y) ** 2
+            if best is None or distance < best_distance:
+                best = thing
+                best_distance = distance
+        return best
+
+    def _next_door(self, game) -> Optional[Direction]:
+        """Breadth-first search over room doors for the closest room worth visiting."""
+        dungeon = game.dungeon
+        start = dungeon.current_room_pos
+        came_from = {start: None}
+        queue = deque([start])
+        goal = None
+
+        while queue:
+            pos = queue.popleft()
+            room = dungeon.rooms[pos]
+            if pos != start and self._wants_room(dungeon, room):
+                goal = pos
+                break
+            for direction, next_pos in dungeon.neighbours(pos).items():
+                if next_pos not in came_from:
+                    came_from[next_pos] = (pos, direction)
+                    queue.append(next_pos)
+
+        if goal is None:
+            return None
+
+        # Walk back to the first step out of the current room
+        pos = goal
+        while came_from[pos][0] != start:
+            pos = came_from[pos][0]
+        return came_from[pos][1]
+
+    def _wants_room(self, dungeon: DungeonMap, room: Room) -> bool:
+        if room.enemies or room.power_ups or not room.explored:
+            return True
+        return dungeon.floor_completed and room.room_type == RoomType.BOSS
+
+    def _door_target(self, player: Player, room: Room, direction: Direction) -> Tuple[float, float]:
+        # Line up with the door gap first, then walk straight through it
+        door_x = room.width // 2 + direction.value[0] * (room.width // 2 + 40)
+        door_y = room.height // 2 + direction.value[1] * (room.height // 2 + 40)
+        if direction in [Direction.NORTH, Direction.SOUTH]:
+            if abs(player.x - door_x) > 8:
+                return door_x, room.height // 2 + direction.value[1] * (room.height // 2 - 60)
+        elif abs(player.y - door_y) > 8:
+            return room.width // 2 + direction.value[0] * (room.width // 2 - 60), door_y
+        return door_x, door_y
+
+    def _steer(self, player: Player, target_x: float, target_y: float) -> Tuple[float, float]:
+        # Obstacles are not path-planned around; a short random detour unsticks the bot
+        pos = (player.x, player.y)
+        if self.last_pos and abs(pos[0] - self.last_pos[0]) + abs(pos[1] - self.last_pos[1]) < 0.5:
+            self.stuck_frames += 1
+        else:
+            self.stuck_frames = 0
+        self.last_pos = pos
+
+        if self.stuck_frames > 15 and self.detour_frames == 0:
+            self.detour_frames = 25
+            self.detour = random.choice([(1, 0), (-1, 0), (0, 1), (0, -1)])
+        if self.detour_frames > 0:
+            self.detour_frames -= 1
+            return self.detour
+
+        dx = target_x - player.x
+        dy = target_y - player.y
+        return (dx > 2) - (dx < -2), (dy > 2) - (dy < -2)
+
+class SoakMonitor:
+    """Logs frame time and memory growth at a fixed interval during long bot runs."""
+    def __init__(self, interval: int = 600):
+        self.interval = interval
+        self.frames = 0
+        self.frame_times: List[float] = []
+        self.baseline_memory = None
+        tracemalloc.start()
+
+    def record(self, frame_time: float, game):
+        self.frames += 1
+        self.frame_times.append(frame_time)
+        if len(self.frame_times) < self.interval:
+            return
+
+        current, peak = tracemalloc.get_traced_memory()
+        if self.baseline_memory is None:
+            self.baseline_memory = current
+        average = sum(self.frame_times) / len(self.frame_times)
+        worst = max(self.frame_times)
+        print(f"[soak] frame {self.frames} floor {game.dungeon.current_floor}: "
+              f"avg {average * 1000:.2f}ms worst {worst * 1000:.2f}ms "
+              f"mem {current / 1024:.0f}KB ({(current - self.baseline_memory) / 1024:+.0f}KB) "
+              f"peak {peak / 1024:.0f}KB rooms {game.resources.resident_bytes() / 1024:.0f}KB")
+        self.frame_times = []
@@ -1,4 +1,8 @@
+from array import array
+from collections import deque
+
 from Objects import *
+from Config import RoomConfig
 
 # UI: add floor timer
 # UI: add enemy count
@@ -39,14 +43,67 @@ class RoomType(Enum):
     BOSS = "boss"
     TREASURE = "treasure"
 
+class FloorGrid:
+    """Room floor tile indexes, stored row-major in a single uint16 array."""
+    def __init__(self, rows: int, cols: int, fill: int = 0):
+        self.rows = rows
+        self.cols = cols
+        self.cells = array('H', [fill]) * (rows * cols)
+        self.uniform: Optional[int] = fill  # The tile index while every cell holds the same one
+
+    def __getitem__(self, pos: Tuple[int, int]) -> int:
+        row, col = pos
+        return self.cells[row * self.cols + col]
+
+    def __setitem__(self, pos: Tuple[int, int], tile_idx: int):
+        row, col = pos
+        self.cells[row * self.cols + col] = tile_idx
+        if tile_idx != self.uniform:
+            self.uniform = None
+
+    def row(self, row: int) -> memoryview:
+        """Zero-copy view of one row."""
+        start = row * self.cols
+        return memoryview(self.cells)[start:start + self.cols]
+
+    def view(self) -> memoryview:
+        """Zero-copy 2D view, indexable as view[row, col]."""
+        return memoryview(self.cells).cast('B').cast('H', (self.rows, self.cols))
+
+    def runs(self, row: int) -> List[Tuple[int, int, int]]:
+        """Run-length encode a row as (start col, length, tile index)."""
+        if self.uniform is not None:
+            return [(0, self.cols, self.uniform)]
+        runs = []
+        cells = self.row(row)
+        start = 0
+        for col in range(1, self.cols + 1):
+            if col == self.cols or cells[col] != cells[start]:
+                runs.append((start, col - start, cells[start]))
+                start = col
+        return runs
+
+    def nbytes(self) -> int:
+        return self.cells.buffer_info()[1] * self.cells.itemsize
+
 class Room:
-    def __init__(self, x: int, y: int, room_type: RoomType = RoomType.NORMAL):
+    def __init__(self, x: int, y: int, room_type: RoomType = RoomType.NORMAL, seed: Optional[int] = None,
+                 config: Optional[RoomConfig] = None, walls: Optional[List[pygame.Rect]] = None,
+                 spawns: Optional[List[Tuple[float, float, bool]]] = None,
+                 unmerged_walls: Optional[int] = None):
         self.grid_x = x
         self.grid_y = y
         self.room_type = room_type
-        self.width = 1200
-        self.height = 1200
+        self.config = config or RoomConfig()
+        # Everything random about a room comes from its seed, so it can be rebuilt exactly
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.rng = random.Random(self.seed)
+        self.width = self.config.width
+        self.height = self.config.height
         self.walls: List[pygame.Rect] = []
+        self.unmerged_walls = 0  # Walls the layout placed, before merge_rects
+        self._wall_index: Optional[WallIndex] = None
+        self._occupancy: Optional[OccupancyGrid] = None
         self.enemies: List[Enemy] = []
         self.doors: Dict[Direction, bool] = {
             Direction.NORTH: False,
@@ -57,15 +114,58 @@ class Room:
         self.explored = False
         self.power_ups: List[PowerUp] = []
         self.boss_defeated = False
-        self.generate_layout()
-        self.spawn_enemies()
+        self.staircase_open = False
+        self._triggers: Optional[TriggerIndex] = None
+        if walls is None:
+            self.generate_layout()
+            self.spawn_enemies()
+        else:
+            # Layout and spawn table come from the on-disk floor cache
+            self.walls = walls
+            # Merged before they were cached; the cache keeps the count from before
+            self.unmerged_walls = unmerged_walls if unmerged_walls is not None else len(walls)
+            self._reset_wall_caches()
+            self.spawn_from_table(spawns)
         self.total_enemies = len(self.enemies)  # Store initial enemy count
 
-        # New attributes for floor tiles
-        self.floor_spritesheet = pygame.image.load("tiles/floor.png").convert_alpha()
+        # Floor tiles and enemy frames are render data: the resource manager
+        # loads them for rooms near the player and can release them again
         self.floor_tile_size = 32
-        self.floor_tiles = self._load_floor_tiles()
-        self.floor_grid = self._generate_floor_grid()
+        self.floor_spritesheet: Optional[pygame.Surface] = None
+        self.floor_tiles: Optional[List[pygame.Surface]] = None
+        self.floor_grid: Optional[FloorGrid] = None
+
+    def has_render_data(self) -> bool:
+        return self.floor_tiles is not None
+
+    def load_render_data(self):
+        if self.floor_tiles is None:
+            self.floor_spritesheet = assets.get(FLOOR_SHEET)  # Shared by every room
+            self.floor_tiles = self._load_floor_tiles()
+            self.floor_grid = self._generate_floor_grid()
+        for enemy in self.enemies:
+            enemy.load_render_data()
+
+    def release_render_data(self):
+        self.floor_spritesheet = None
+        self.floor_tiles = None
+        self.floor_grid = None
+        for enemy in self._held_enemies():
+            enemy.release_render_data()
+
+    def _held_enemies(self) -> List[Enemy]:
+        # Enemies in the room now, including ones that walked in from elsewhere,
+        # plus this room's dead (they stay referenced for saved games)
+        return self.enemies + [enemy for enemy in self.spawned_enemies if enemy.health <= 0]
+
+    def render_data_bytes(self) -> int:
+        """Rough size of the surfaces and grid this room currently holds."""
+        total = sum(enemy.render_data_bytes() for enemy in self._held_enemies())
+        if self.floor_tiles is None:
+            return total
+        total += sum(surface_bytes(tile) for tile in self.floor_tiles)
+        total += self.floor_grid.nbytes()
+        return total
 
     def _load_floor_tiles(self):
         tiles = []
@@ -82,67 +182,76 @@ class Room:
         
         return tiles
 
-    def _generate_floor_grid(self):
+    def _generate_floor_grid(self) -> 'FloorGrid':
         # Create a grid of tile indexes for the floor
-        grid = []
         rows = self.height // self.floor_tile_size
         cols = self.width // self.floor_tile_size
+        # Own generator so the grid comes out the same every time it is rebuilt
+        rng = random.Random(f"{self.seed}-floor")
         
         # Choose floor tile patterns based on room type
         if self.room_type == RoomType.START:
-            main_tile = random.randint(10,500)  # Index of your starting room floor tile
+            main_tile = rng.randint(10,500)  # Index of your starting room floor tile
         elif self.room_type == RoomType.BOSS:
-            main_tile = random.randint(10,500)  # Index of your boss room floor tile
+            main_tile = rng.randint(10,500)  # Index of your boss room floor tile
         elif self.room_type == RoomType.TREASURE:
-            main_tile = random.randint(10,500)  # Index of your treasure room floor tile
+            main_tile = rng.randint(10,500)  # Index of your treasure room floor tile
         else:
-            main_tile = random.randint(10,500)  # Index of your normal room floor tile
+            main_tile = rng.randint(10,500)  # Index of your normal room floor tile
         
-        # Generate grid with occasional variety
-        for row in range(rows):
-            grid_row = []
-            for col in range(cols):
-                tile_idx = main_tile
-                # if random.random() < 0.1:  # 10% chance for a variation
-                #     tile_idx = random.choice([i for i in range(len(self.floor_tiles)) if i != main_tile])                    
-                grid_row.append(tile_idx)
-            grid.append(grid_row)
+        # Uniform fill is a single array repeat; variations are written on top
+        grid = FloorGrid(rows, cols, main_tile)
+        # for row in range(rows):
+        #     for col in range(cols):
+        #         if rng.random() < 0.1:  # 10% chance for a variation
+        #             grid[row, col] = rng.choice([i for i in range(len(self.floor_tiles)) if i != main_tile])
         
         return grid
         
     def _find_safe_enemy_position(self, size: int) -> Tuple[int, int]:
         """Find a safe position that doesn't collide with walls for an enemy of given size."""
-        for _ in range(100):  # Try up to 100 times to find a safe position
-            x = random.randint(50, self.width - 50)
-            y = random.randint(50, self.height - 50)
-            
-            test_rect = pygame.Rect(x - size/2, y - size/2, size, size)
-            
-            if not any(test_rect.colliderect(wall) for wall in self.walls):
-                return x, y
-                
-        # If we couldn't find a position after 100 tries, use the center (should be safe)
-        return self.width // 2, self.height // 2
+        position = self.occupancy.random_free_position(size, self.rng, margin=50)
+        # The center is the last resort for a room with no space left at all
+        return position or (self.width // 2, self.height // 2)
 
     def spawn_enemies(self):
         if self.room_type == RoomType.BOSS:
             # Spawn boss (stronger enemy)
             boss_size = 48
             x, y = self._find_safe_enemy_position(boss_size)
-            boss = Enemy(x, y, is_boss=True)
-            boss.health = 200
-            boss.max_health = 200
-            boss.damage = 15
-            boss.size = boss_size
-            self.enemies = [boss]
+            self.enemies = [self._create_enemy(x, y, is_boss=True)]
         elif self.room_type == RoomType.NORMAL:
-            # Spawn 2-4 regular enemies
-            num_enemies = random.randint(2, 4)
+            # Spawn 2-4 regular enemies (by default)
+            num_enemies = self.rng.randint(self.config.min_enemies, self.config.max_enemies)
             self.enemies = []
             for _ in range(num_enemies):
                 enemy_size = 32  # Default enemy size
                 x, y = self._find_safe_enemy_position(enemy_size)
-                self.enemies.append(Enemy(x, y))
+                self.enemies.append(self._create_enemy(x, y))
+        self._register_spawns()
+
+    def spawn_from_table(self, spawns: List[Tuple[float, float, bool]]):
+        self.enemies = [self._create_enemy(x, y, is_boss) for x, y, is_boss in spawns]
+        self._register_spawns()
+
+    def spawn_table(self) -> List[Tuple[float, float, bool]]:
+        return [(enemy.x, enemy.y, enemy.is_boss) for enemy in self.spawned_enemies]
+
+    def _create_enemy(self, x: float, y: float, is_boss: bool = False) -> Enemy:
+        enemy = Enemy(x, y, is_boss=is_boss)
+        if is_boss:
+            enemy.health = 200
+            enemy.max_health = 200
+            enemy.damage = 15
+            enemy.size = 48
+        return enemy
+
+    def _register_spawns(self):
+        # Remember every spawned enemy so saved games can refer to them by index
+        self.spawned_enemies = list(self.enemies)
+        for spawn_id, enemy in enumerate(self.spawned_enemies):
+            enemy.spawn_id = spawn_id
+            enemy.home_pos = enemy.room_pos = (self.grid_x, self.grid_y)
                 
     def generate_layout(self):
         # Clear existing walls
@@ -190,23 +299,123 @@ class Room:
             
         # Add more random obstacles for larger rooms
         if self.room_type not in [RoomType.BOSS, RoomType.TREASURE]:
-            num_obstacles = 15  # More obstacles for larger rooms
+            num_obstacles = self.config.num_obstacles
             for _ in range(num_obstacles):
-                obstacle_width = random.randint(30, 80)
-                obstacle_height = random.randint(30, 80)
-                x = random.randint(wall_thickness + 50, self.width - wall_thickness - 50 - obstacle_width)
-                y = random.randint(wall_thickness + 50, self.height - wall_thickness - 50 - obstacle_height) 
+                obstacle_width = self.rng.randint(30, 80)
+                obstacle_height = self.rng.randint(30, 80)
+                x = self.rng.randint(wall_thickness + 50, self.width - wall_thickness - 50 - obstacle_width)
+                y = self.rng.randint(wall_thickness + 50, self.height - wall_thickness - 50 - obstacle_height) 
                 self.walls.append(pygame.Rect(x, y, obstacle_width, obstacle_height))
 
+        # Obstacles often overlap each other and the border walls; keep only their union
+        self.unmerged_walls = len(self.walls)
+        self.walls = merge_rects(self.walls)
+        self._reset_wall_caches()
+
+    def _reset_wall_caches(self):
+        # Built on first use: rooms loaded from the floor cache that the player
+        # never enters never pay for them
+        self._wall_index = None
+        self._occupancy = None
+
+    @property
+    def wall_index(self) -> WallIndex:
+        if self._wall_index is None:
+            self._wall_index = WallIndex(self.walls)
+        return self._wall_index
+
+    @property
+    def occupancy(self) -> OccupancyGrid:
+        if self._occupancy is None:
+            self._occupancy = OccupancyGrid(self.width, self.height, self.walls)
+        return self._occupancy
+
+    @property
+    def triggers(self) -> TriggerIndex:
+        # Built on first use, once the dungeon has decided where the doors are
+        if self._triggers is None:
+            self._triggers = TriggerIndex()
+            for direction, is_open in self.doors.items():
+                if is_open:
+                    self._triggers.add(self._door_trigger(direction))
+            for power_up in self.power_ups:
+                self._triggers.add(self._pickup_trigger(power_up))
+            if self.staircase_open:
+                self._triggers.add(self._staircase_trigger())
+        return self._triggers
+
+    def _door_trigger(self, direction: Direction) -> Trigger:
+        x, y, width, height = {
+            Direction.NORTH: (self.width // 2 - 40, 0, 80, 5),
+            Direction.SOUTH: (self.width // 2 - 40, self.height - 5, 80, 5),
+            Direction.WEST: (0, self.height // 2 - 40, 5, 80),
+            Direction.EAST: (self.width - 5, self.height // 2 - 40, 5, 80),
+        }[direction]
+        # Moved half a player up and left of the door strip: the door test has
+        # always used a 32px box hanging down and right of the player's center,
+        # and this keeps transitions exactly where they were
+        return Trigger(x - 16, y - 16, x + width - 16, y + height - 16, "door", direction)
+
+    def _pickup_trigger(self, power_up: PowerUp) -> Trigger:
+        half = power_up.size / 2
+        return Trigger(power_up.x - half, power_up.y - half, power_up.x + half, power_up.y + half,
+                       "pickup", power_up)
+
+    def _staircase_trigger(self) -> Trigger:
+        return Trigger(self.width // 2 - 40, self.height // 2 - 40, self.width // 2 + 40, self.height // 2 + 40,
+                       "staircase")
+
+    def add_power_up(self, power_up: PowerUp):
+        self.power_ups.append(power_up)
+        if self._triggers is not None:
+            self._triggers.add(self._pickup_trigger(power_up))
+
+    def remove_power_up(self, power_up: PowerUp):
+        self.power_ups.remove(power_up)
+        if self._triggers is not None:
+            self._triggers.remove(self._triggers.find("pickup", power_up))
+
+    def clear_power_ups(self):
+        for power_up in self.power_ups[:]:
+            self.remove_power_up(power_up)
+
+    def open_staircase(self):
+        if not self.staircase_open:
+            self.staircase_open = True
+            if self._triggers is not None:
+                self._triggers.add(self._staircase_trigger())
+
+    def close_staircase(self):
+        if self.staircase_open:
+            self.staircase_open = False
+            if self._triggers is not None:
+                self._triggers.remove(self._triggers.find("staircase"))
+
 class DungeonMap:
-    def __init__(self, size: int = 5, num_floors: int = 3):
+    def __init__(self, size: int = 5, num_floors: int = 3, seed: Optional[int] = None,
+                 room_config: Optional[RoomConfig] = None, cache=None):
         self.size = size
+        self.room_config = room_config or RoomConfig()
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.rng = random.Random(self.seed)
         self.rooms: Dict[Tuple[int, int], Room] = {}
         self.current_room_pos = (0, 0)
         self.current_floor = 1
         self.num_floors = num_floors
         self.floor_completed = False
-        self.generate_dungeon()
+        self.graph: Dict[Tuple[int, int], Dict[Direction, Tuple[int, int]]] = {}
+        self.depth: Dict[Tuple[int, int], int] = {}
+        self.boss_pos: Optional[Tuple[int, int]] = None
+        # A FloorCache skips generation entirely for seeds that were built before
+        if cache is None or not cache.load(self):
+            self.generate_dungeon()
+            if cache is not None:
+                cache.save(self)
+
+    def attach_events(self, events: EventBus):
+        for room in self.rooms.values():
+            for enemy in room.spawned_enemies:
+                enemy.events = events
 
     def is_floor_complete(self) -> bool:
         # Check if all enemies on the current floor are defeated
@@ -222,50 +431,65 @@ class DungeonMap:
         return alive_count, total_count
         
     def spawn_staircase(self):
-        # Find boss room and spawn staircase
-        for pos, room in self.rooms.items():
-            if room.room_type == RoomType.BOSS and room.boss_defeated:
-                # Create a special door/staircase in the boss room
-                self.floor_completed = True
-                print(f"Staircase spawned at position {pos}")
-                return pos
+        # Spawn the staircase in the boss room once the boss is down
+        if self.boss_pos is not None and self.rooms[self.boss_pos].boss_defeated:
+            # Create a special door/staircase in the boss room
+            self.floor_completed = True
+            self.rooms[self.boss_pos].open_staircase()
+            print(f"Staircase spawned at position {self.boss_pos}")
+            return self.boss_pos
         return None
         
     def generate_dungeon(self):
-        # Start with a room at (0,0)
-        self.rooms[(0, 0)] = Room(0, 0, RoomType.START)
+        # Lay out the room graph first, then pick room types, then build the rooms
+        start = (0, 0)
+        self.graph = {start: {}}
+        self.depth = {start: 0}  # Doors away from the start room (the graph is a tree)
+        frontier = deque([start])
         
-        # Generate connected rooms
-        positions_to_process = [(0, 0)]
-        connected_positions = set([(0, 0)])
-        
-        while positions_to_process and len(self.rooms) < self.size:
-            current_pos = positions_to_process.pop(0)
+        while len(self.graph) < self.size:
+            if not frontier:
+                # Every room lost its coin flips this pass; give them all another go
+                frontier.extend(self.graph)
+            current_pos = frontier.popleft()
             
             for direction in Direction:
+                if len(self.graph) >= self.size:
+                    break
                 new_pos = (current_pos[0] + direction.value[0],
                           current_pos[1] + direction.value[1])
                 
-                if (new_pos not in connected_positions and 
-                    len(self.rooms) < self.size and
-                    random.random() < 0.7):  # 70% chance to create a room
-                    
-                    # Create new room
-                    room_type = RoomType.NORMAL
-                    if len(self.rooms) == self.size - 1:
-                        room_type = RoomType.BOSS
-                    elif random.random() < 0.1:
-                        room_type = RoomType.TREASURE
-                        
-                    new_room = Room(new_pos[0], new_pos[1], room_type)
-                    self.rooms[new_pos] = new_room
-                    
+                if new_pos not in self.graph and self.rng.random() < 0.7:  # 70% chance to create a room
                     # Connect rooms with doors
-                    self.rooms[current_pos].doors[direction] = True
-                    new_room.doors[self._opposite_direction(direction)] = True
-                    
-                    connected_positions.add(new_pos)
-                    positions_to_process.append(new_pos)
+                    self.graph[current_pos][direction] = new_pos
+                    self.graph[new_pos] = {self._opposite_direction(direction): current_pos}
+                    self.depth[new_pos] = self.depth[current_pos] + 1
+                    frontier.append(new_pos)
+        
+        # The boss sits as far from the start as the layout allows
+        self.boss_pos = max(self.graph, key=self.depth.get) if self.size > 1 else None
+        
+        for pos, neighbours in self.graph.items():
+            if pos == start:
+                room_type = RoomType.START
+            elif pos == self.boss_pos:
+                room_type = RoomType.BOSS
+            elif self.rng.random() < 0.1:
+                room_type = RoomType.TREASURE
+            else:
+                room_type = RoomType.NORMAL
+                
+            room = Room(pos[0], pos[1], room_type, self.rng.getrandbits(32), self.room_config)
+            for direction in neighbours:
+                room.doors[direction] = True
+            self.rooms[pos] = room
+
+    def neighbour(self, pos: Tuple[int, int], direction: Direction) -> Optional[Tuple[int, int]]:
+        """The room through the door in that direction, or None if there is no door."""
+        return self.graph[pos].get(direction)
+
+    def neighbours(self, pos: Tuple[int, int]) -> Dict[Direction, Tuple[int, int]]:
+        return self.graph[pos]
 
     def _opposite_direction(self, direction: Direction) -> Direction:
         opposites = {
@@ -282,16 +506,37 @@ class Minimap:
         self.cell_size = 20
         self.padding = 10
         self.surface = pygame.Surface((200, 200))
+        self.drawn_pos: Optional[Tuple[int, int]] = None  # Room the surface was last drawn for
         
-    def draw(self, screen: pygame.Surface):
+    def draw(self, screen: pygame.Surface, refresh: bool = True):
+        # Between refreshes the last surface is reused, unless the player changed rooms
+        if refresh or self.drawn_pos != self.dungeon_map.current_room_pos:
+            self._redraw()
+        
+        # Draw minimap in top-right corner
+        screen.blit(self.surface, (screen.get_width() - 220, 20))
+
+    def _redraw(self):
+        self.drawn_pos = self.dungeon_map.current_room_pos
         self.surface.fill((0, 0, 0))
         self.surface.set_alpha(128)
         
+        # Keep the current room in the middle and only visit the grid cells
+        # that fit on the minimap, so large floors cost the same as small ones
+        step = self.cell_size + self.padding
+        center_x, center_y = self.dungeon_map.current_room_pos
+        offset_x = 100 - self.cell_size // 2 - center_x * step
+        offset_y = 100 - self.cell_size // 2 - center_y * step
+        reach = self.surface.get_width() // (2 * step) + 1
+        
         # Draw each explored room
-        for pos, room in self.dungeon_map.rooms.items():
-            if room.explored:
-                x = pos[0] * (self.cell_size + self.padding) + 100
-                y = pos[1] * (self.cell_size + self.padding) + 100
+        for grid_y in range(center_y - reach, center_y + reach + 1):
+            for grid_x in range(center_x - reach, center_x + reach + 1):
+                room = self.dungeon_map.rooms.get((grid_x, grid_y))
+                if room is None or not room.explored:
+                    continue
+                x = grid_x * step + offset_x
+                y = grid_y * step + offset_y
                 
                 # Draw room
                 color = self._get_room_color(room)
@@ -299,20 +544,16 @@ class Minimap:
                                (x, y, self.cell_size, self.cell_size))
                 
                 # Draw doors
-                for direction, has_door in room.doors.items():
-                    if has_door:
-                        door_pos = self._get_door_position(x, y, direction)
-                        pygame.draw.rect(self.surface, (200, 200, 200),
-                                       door_pos)
+                for direction in self.dungeon_map.neighbours((grid_x, grid_y)):
+                    door_pos = self._get_door_position(x, y, direction)
+                    pygame.draw.rect(self.surface, (200, 200, 200),
+                                   door_pos)
         
         # Draw current room indicator
-        current_x = self.dungeon_map.current_room_pos[0] * (self.cell_size + self.padding) + 100
-        current_y = self.dungeon_map.current_room_pos[1] * (self.cell_size + self.padding) + 100
+        current_x = center_x * step + offset_x
+        current_y = center_y * step + offset_y
         pygame.draw.rect(self.surface, (255, 255, 255),
                         (current_x, current_y, self.cell_size, self.cell_size), 2)
-        
-        # Draw minimap in top-right corner
-        screen.blit(self.surface, (screen.get_width() - 220, 20))
     
     def _get_room_color(self, room: Room) -> Tuple[int, int, int]:
         colors = {
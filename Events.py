@@ -0,0 +1,60 @@
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional, Tuple, Type
+
+
+@dataclass
+class EnemyDied:
+    enemy: 'Enemy'
+    room_pos: Tuple[int, int]
+
+@dataclass
+class EnemyHit:
+    enemy: 'Enemy'
+    amount: int
+    room_pos: Tuple[int, int]
+
+@dataclass
+class BossDefeated:
+    room_pos: Tuple[int, int]
+
+@dataclass
+class PowerUpCollected:
+    power_up: 'PowerUp'
+    room_pos: Tuple[int, int]
+
+@dataclass
+class FloorCleared:
+    floor: int
+
+@dataclass
+class Noise:
+    x: float
+    y: float
+    radius: float
+    room_pos: Tuple[int, int]
+
+@dataclass
+class RoomEntered:
+    room_pos: Tuple[int, int]
+    direction: Optional['Direction'] = None  # None when a floor starts or a save is loaded
+
+class EventBus:
+    """Typed publish/subscribe. Events are queued where they happen and
+    delivered when the game calls dispatch(), so handlers never run while
+    the code that raised them is still iterating its lists."""
+    def __init__(self):
+        self.handlers: Dict[Type, List[Callable]] = defaultdict(list)
+        self.queue: Deque = deque()
+
+    def subscribe(self, event_type: Type, handler: Callable):
+        self.handlers[event_type].append(handler)
+
+    def post(self, event):
+        self.queue.append(event)
+
+    def dispatch(self):
+        while self.queue:
+            event = self.queue.popleft()
+            for handler in self.handlers[type(event)]:
+                handler(event)
@@ -0,0 +1,125 @@
+import hashlib
+import inspect
+import mmap
+import os
+import struct
+from dataclasses import astuple
+
+from Dungeon import *
+from Spatial import OccupancyGrid, merge_rects, _decompose
+
+# Cached floor layout (little-endian):
+#   header, then per room a record followed by its walls and spawn table.
+# Walls are stored as packed little-endian int32 x, y, w, h and unpacked
+# straight out of the memory-mapped file.
+CACHE_MAGIC = b"DGFC"
+CACHE_FORMAT = 2
+
+HEADER = struct.Struct("<4sH20sIHH")  # magic, format, generator hash, seed, size, room count
+ROOM = struct.Struct("<hhBIBHIIH")    # x, y, type, seed, door bits, depth, wall count, walls before merge, spawn count
+WALL = struct.Struct("<4i")
+SPAWN = struct.Struct("<ff?")         # x, y, is boss
+
+ROOM_TYPES = list(RoomType)
+DOOR_BITS = {direction: 1 << i for i, direction in enumerate(Direction)}
+
+CACHE_DIR = os.path.join(".cache", "floors")
+
+def _generator_hash() -> bytes:
+    # Any edit to the code that decides a floor's layout changes this hash,
+    # which makes every file written by the old code a cache miss
+    sources = [
+        inspect.getsource(DungeonMap.generate_dungeon),
+        inspect.getsource(Room.generate_layout),
+        inspect.getsource(Room.spawn_enemies),
+        inspect.getsource(Room._find_safe_enemy_position),
+        inspect.getsource(Room._create_enemy),
+        inspect.getsource(OccupancyGrid),
+        inspect.getsource(merge_rects),
+        inspect.getsource(_decompose),
+        str(CACHE_FORMAT),
+    ]
+    return hashlib.sha1("\n".join(sources).encode()).digest()
+
+GENERATOR_HASH = _generator_hash()
+
+class FloorCache:
+    """On-disk cache of generated floors, keyed by seed, size and room config."""
+    def __init__(self, directory: str = CACHE_DIR):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, dungeon: DungeonMap) -> str:
+        config = hashlib.sha1(repr(astuple(dungeon.room_config)).encode()).hexdigest()[:12]
+        return os.path.join(self.directory, f"{dungeon.seed:08x}-{dungeon.size}-{config}.floor")
+
+    def load(self, dungeon: DungeonMap) -> bool:
+        """Fill in dungeon's rooms from the cache. False on a miss or stale file."""
+        path = self.path_for(dungeon)
+        if not os.path.exists(path):
+            self.misses += 1
+            return False
+
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            magic, file_format, generator, seed, size, room_count = HEADER.unpack_from(data, 0)
+            if (magic != CACHE_MAGIC or file_format != CACHE_FORMAT or generator != GENERATOR_HASH
+                    or seed != dungeon.seed or size != dungeon.size):
+                self.misses += 1
+                return False
+
+            offset = HEADER.size
+            view = memoryview(data)
+            try:
+                for _ in range(room_count):
+                    (x, y, type_index, room_seed, doors, depth,
+                     wall_count, unmerged_walls, spawn_count) = ROOM.unpack_from(data, offset)
+                    offset += ROOM.size
+
+                    walls = [pygame.Rect(*values)
+                             for values in WALL.iter_unpack(view[offset:offset + wall_count * WALL.size])]
+                    offset += wall_count * WALL.size
+
+                    spawns = [SPAWN.unpack_from(data, offset + i * SPAWN.size) for i in range(spawn_count)]
+                    offset += spawn_count * SPAWN.size
+
+                    room = Room(x, y, ROOM_TYPES[type_index], room_seed, dungeon.room_config, walls, spawns,
+                                unmerged_walls)
+                    self._restore_doors(dungeon, room, doors)
+                    dungeon.depth[(x, y)] = depth
+                    dungeon.rooms[(x, y)] = room
+            finally:
+                view.release()
+
+        boss = [pos for pos, room in dungeon.rooms.items() if room.room_type == RoomType.BOSS]
+        dungeon.boss_pos = boss[0] if boss else None
+        self.hits += 1
+        return True
+
+    def _restore_doors(self, dungeon: DungeonMap, room: Room, doors: int):
+        pos = (room.grid_x, room.grid_y)
+        dungeon.graph[pos] = {}
+        for direction, bit in DOOR_BITS.items():
+            if doors & bit:
+                room.doors[direction] = True
+                dungeon.graph[pos][direction] = (pos[0] + direction.value[0], pos[1] + direction.value[1])
+
+    def save(self, dungeon: DungeonMap):
+        parts = [HEADER.pack(CACHE_MAGIC, CACHE_FORMAT, GENERATOR_HASH, dungeon.seed,
+                             dungeon.size, len(dungeon.rooms))]
+        for pos, room in dungeon.rooms.items():
+            doors = 0
+            for direction in dungeon.neighbours(pos):
+                doors |= DOOR_BITS[direction]
+            spawns = room.spawn_table()
+            parts.append(ROOM.pack(pos[0], pos[1], ROOM_TYPES.index(room.room_type), room.seed,
+                                   doors, dungeon.depth[pos], len(room.walls), room.unmerged_walls, len(spawns)))
+            parts.extend(WALL.pack(wall.x, wall.y, wall.width, wall.height) for wall in room.walls)
+            parts.extend(SPAWN.pack(x, y, is_boss) for x, y, is_boss in spawns)
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(dungeon)
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(b"".join(parts))
+        os.replace(temp_path, path)
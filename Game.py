@@ -1,9 +1,34 @@
+from time import perf_counter
+from typing import Callable, Deque
+LAUNCHED = perf_counter()
+
 from Dungeon import *
 from Objects import *
+from Controllers import *
+from SaveGame import *
+from Resources import *
+from Config import FloorConfig, PRESETS
+from Profiling import Profiler, StartupTimer
+from Events import *
+from Quality import QualityController
+from Simulation import BackgroundSimulation
+from AI import AIScheduler
+from Bullets import BulletField, boss_patterns
+from Particles import ParticleSystem
+from Renderers import *
+
+startup = StartupTimer(LAUNCHED)
+startup.mark("imports")
+
+ABILITY_NOISE = 250  # Using an ability wakes enemies this far beyond its range
 
 class Game:
-    def __init__(self):
+    def __init__(self, controller: Optional[Controller] = None, endless: bool = False,
+                 memory_budget: int = 32 * 1024 * 1024, config: Optional[FloorConfig] = None,
+                 seed: Optional[int] = None, renderer: str = "topdown"):
         pygame.init()
+        # Start decoding every sheet now so it overlaps with floor generation
+        assets.prefetch(ALL_SHEETS)
         self.width = 800
         self.height = 600
         self.screen = pygame.display.set_mode((self.width, self.height))
@@ -11,196 +36,251 @@ class Game:
         self.running = True
 
         self.flash_message = None
+        self.controller = controller or KeyboardController()
+        self.endless = endless  # Loop back to floor 1 instead of ending (soak runs)
+        self.quicksave: Optional[bytes] = None  # Snapshot taken on every room transition
+        # Non-critical loading, run one item per frame once the first frame is up
+        # and the image it needs has finished decoding
+        self.deferred: Deque[Tuple[Callable[[], None], Optional[str]]] = deque()
         
-        self.dungeon = DungeonMap(size=4)  # Create 8 rooms
-        self.minimap = Minimap(self.dungeon)
+        self.config = config or PRESETS["default"]
+        self.profiler = Profiler()
+        self.quality = QualityController()
+        self.ai = AIScheduler()
+        self.bullets = BulletField()
+        self.particles = ParticleSystem()
+        self.visibility: Optional[VisibilityMap] = None  # What the player sees of the current room
+        self.ticks = 0
+        self.effect_dt = 0.0  # Effect animation time not yet applied at reduced quality
+        self.events = EventBus()
+        self.events.subscribe(EnemyHit, self._on_enemy_hit)
+        self.events.subscribe(EnemyDied, self._on_enemy_died)
+        self.events.subscribe(BossDefeated, self._on_boss_defeated)
+        self.events.subscribe(FloorCleared, self._on_floor_cleared)
+        self.events.subscribe(PowerUpCollected, self._on_power_up_collected)
+        self.events.subscribe(RoomEntered, self._on_room_entered)
+        self.events.subscribe(Noise, self._on_noise)
+
+        # Tells the renderer to re-render HUD text, whose numbers only change on events
+        self.hud_dirty = True
+        # A fixed run seed (e.g. a daily challenge) replays the same floors, so
+        # those are worth caching on disk; random runs never repeat
+        self.run_rng = random.Random(seed)
+        self.seeded = seed is not None
+        self.floor_cache = None
+        if self.seeded:
+            # Hashing the generator sources is only worth paying for on seeded runs
+            from FloorCache import FloorCache
+            self.floor_cache = FloorCache()
+        with self.profiler.section("generation"):
+            self.dungeon = self._create_floor(self.config.first_floor_size, self.config.num_floors)
+        self.memory_budget = memory_budget
+        self._setup_floor()
         current_room = self.dungeon.rooms[self.dungeon.current_room_pos]
         safe_x, safe_y = self._find_safe_position(current_room, self.width // 2, self.height // 2)
         self.player = Player(safe_x, safe_y)
-        
-        # Add camera
-        self.camera = Camera(self.width, self.height)
+        self.defer(self.player.abilities["aoe"].load_animation, EFFECT_SHEET)
 
         # Mark starting room as explored
         self.dungeon.rooms[self.dungeon.current_room_pos].explored = True
-        # New attributes for floor tiles
-        self.feat_spritesheet = pygame.image.load("tiles/feat.png").convert_alpha()
-        self.feat_tile_size = 32
-        self.feat_tiles = self._load_feat_tiles()
-        row = 9  
-        col = 29  
-        self.staircase_sprite = self._get_sprite_from_sheet(row, col)
-        self.staircase_sprite = pygame.transform.scale(self.staircase_sprite, (80, 80))  # Match the size of the current rectangle
-
-        # self.floor_grid = self._generate_floor_grid()
-
-    def _load_feat_tiles(self):
-        tiles = []
-        sheet_width = self.feat_spritesheet.get_width()
-        sheet_height = self.feat_spritesheet.get_height()
-        x_offset = 2
-        y_offset = 2
-        
-        # Extract all 32x32 tiles from the spritesheet
-        for y in range(0, sheet_height, self.feat_tile_size):
-            for x in range(0, sheet_width, self.feat_tile_size):
-                rect = pygame.Rect(x+x_offset, y+y_offset, self.feat_tile_size, self.feat_tile_size)
-                tile = pygame.Surface((self.feat_tile_size, self.feat_tile_size), pygame.SRCALPHA)
-                tile.blit(self.feat_spritesheet, (0, 0), rect)
-                tiles.append(tile)
-        
-        return tiles
+        self.events.post(RoomEntered(self.dungeon.current_room_pos))
 
-    def _get_sprite_from_sheet(self, row: int, col: int) -> pygame.Surface:
-        """Get a specific sprite from the spritesheet by row and column."""
-        index = row * (self.feat_spritesheet.get_width() // self.feat_tile_size) + col
-        return self.feat_tiles[index]
+        # The view is chosen once at startup; nothing above depends on it
+        self.renderer: Renderer = RENDERERS[renderer](self)
+        startup.mark("game setup")
 
-    def _check_room_transition(self):
-        current_room = self.dungeon.rooms[self.dungeon.current_room_pos]
-        player_rect = pygame.Rect(self.player.x, self.player.y, 32, 32)
-        
-        # Define door areas for a larger room
-        door_areas = {
-            Direction.NORTH: pygame.Rect(current_room.width // 2 - 40, 0, 80, 5),
-            Direction.SOUTH: pygame.Rect(current_room.width // 2 - 40, current_room.height - 5, 80, 5),
-            Direction.WEST: pygame.Rect(0, current_room.height // 2 - 40, 5, 80),
-            Direction.EAST: pygame.Rect(current_room.width - 5, current_room.height // 2 - 40, 5, 80)
-        }
-        
-        # Check collisions with door areas
-        for direction, door_area in door_areas.items():
-            if (current_room.doors[direction] and 
-                player_rect.colliderect(door_area)):
-                self._transition_room(direction)
+    def defer(self, load: Callable[[], None], needs: Optional[str] = None):
+        self.deferred.append((load, needs))
+
+    def stream_assets(self):
+        """Do one piece of deferred loading: queued assets first, then neighbouring rooms."""
+        assets.poll()
+        if self.deferred:
+            load, needs = self.deferred[0]
+            if needs is None or assets.ready(needs):
+                self.deferred.popleft()
+                load()
                 return
+        if assets.ready(FLOOR_SHEET) and assets.ready(ENEMY_SHEET):
+            self.resources.stream()
+
+    def _create_floor(self, size: int, num_floors: int) -> DungeonMap:
+        seed = self.run_rng.getrandbits(32) if self.seeded else None
+        return DungeonMap(size=size, num_floors=num_floors, seed=seed,
+                          room_config=self.config.room, cache=self.floor_cache)
+
+    def _setup_floor(self):
+        """Rebuild everything derived from self.dungeon after it is replaced."""
+        self.minimap = Minimap(self.dungeon)
+        self.resources = RoomResourceManager(self.dungeon, self.memory_budget)
+        self.resources.update(self.dungeon.current_room_pos)
+        self.background = BackgroundSimulation(self.dungeon)
+        self.dungeon.attach_events(self.events)
+        self.alive_enemies, self.total_enemies = self.dungeon.count_enemies()
+        self.hud_dirty = True
+
+    def _check_triggers(self):
+        current_room = self.dungeon.rooms[self.dungeon.current_room_pos]
+        current_room.triggers.update(self.player.x, self.player.y, self.player.size / 2, self._on_trigger_enter)
+
+    def _on_trigger_enter(self, trigger: Trigger):
+        if trigger.kind == "door":
+            self._transition_room(trigger.payload)
+        elif trigger.kind == "pickup":
+            power_up = trigger.payload
+            if not power_up.collected:
+                power_up.apply_effect(self.player)
+                power_up.collected = True
+                self.events.post(PowerUpCollected(power_up, self.dungeon.current_room_pos))
+        elif trigger.kind == "staircase":
+            print(f"Advancing from floor {self.dungeon.current_floor}")
+            self._advance_to_next_floor()
+            print(f"Now on floor {self.dungeon.current_floor}")
     
     def _find_safe_position(self, room: Room, base_x: int, base_y: int) -> Tuple[int, int]:
         """Find a safe position near the given coordinates that doesn't collide with walls."""
-        for offset in range(0, 200, 20):
-            for dx in [-offset, offset]:
-                for dy in [-offset, offset]:
-                    test_x = base_x + dx
-                    test_y = base_y + dy
-                    
-                    # slightly larger than 32x32 player, to give some margin for error
-                    test_rect = pygame.Rect(test_x, test_y, 48, 48)
-                    
-                    if not any(test_rect.colliderect(wall) for wall in room.walls):
-                        if (10 < test_x < room.width - 10 and 
-                            10 < test_y < room.height - 10):
-                            return test_x, test_y
-                            
-        return room.width // 2, room.height // 2
+        # slightly larger than 32x32 player, to give some margin for error
+        position = room.occupancy.nearest_free_position(base_x, base_y, 48)
+        return position or (room.width // 2, room.height // 2)
 
     def _transition_room(self, direction: Direction):
-        new_pos = (
-            self.dungeon.current_room_pos[0] + direction.value[0],
-            self.dungeon.current_room_pos[1] + direction.value[1]
-        )
+        new_pos = self.dungeon.neighbour(self.dungeon.current_room_pos, direction)
         
-        if new_pos in self.dungeon.rooms:
+        if new_pos is not None:
             self.dungeon.current_room_pos = new_pos
             new_room = self.dungeon.rooms[new_pos]
             new_room.explored = True
             
-            # Calculate spawn position based on room size
+            # Calculate spawn position based on room size, far enough in
+            # that the player isn't standing in the door they came through
+            spawn_inset = 60
             if direction == Direction.NORTH:
                 base_x = new_room.width // 2
-                base_y = new_room.height - 24
+                base_y = new_room.height - spawn_inset
             elif direction == Direction.SOUTH:
                 base_x = new_room.width // 2
-                base_y = 24
+                base_y = spawn_inset
             elif direction == Direction.WEST:
-                base_x = new_room.width - 24
+                base_x = new_room.width - spawn_inset
                 base_y = new_room.height // 2
             else:  # EAST
-                base_x = 24
+                base_x = spawn_inset
                 base_y = new_room.height // 2
             
             safe_x, safe_y = self._find_safe_position(new_room, base_x, base_y)
             self.player.x = safe_x
             self.player.y = safe_y
+            self.events.post(RoomEntered(new_pos, direction))
 
     def handle_input(self):
-        keys = pygame.key.get_pressed()
-        # mouse_x, mouse_y = pygame.mouse.get_pos()
+        command = self.controller.get_input(self)
+        current_room = self.dungeon.rooms[self.dungeon.current_room_pos]
         
         # Movement
-        dx = keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]
-        dy = keys[pygame.K_DOWN] - keys[pygame.K_UP]
-        self.player.move(dx, dy, self.dungeon.rooms[self.dungeon.current_room_pos].walls)
-        
-        # # Update player direction based on mouse position
-        # if dx == 0 and dy == 0:  # Only update direction with mouse if not moving
-        #     dx = mouse_x - self.player.x
-        #     dy = mouse_y - self.player.y
-        #     self.player.direction = atan2(dy, dx)
+        self.player.move(command.dx, command.dy, current_room.wall_index)
+        if command.facing is not None:
+            self.player.direction = command.facing
         
         # Abilities
-        if keys[pygame.K_1]:
-            self.player.use_ability("aoe", 
-                self.dungeon.rooms[self.dungeon.current_room_pos].enemies)
-        if keys[pygame.K_2]:
-            self.player.use_ability("cone", 
-                self.dungeon.rooms[self.dungeon.current_room_pos].enemies)
-        if keys[pygame.K_3]:
-            self.player.use_ability("projectile", 
-                self.dungeon.rooms[self.dungeon.current_room_pos].enemies)
+        for ability_name in command.abilities:
+            ability = self.player.abilities[ability_name]
+            if ability.is_ready():
+                self.player.use_ability(ability_name, current_room.enemies)
+                self.events.post(Noise(self.player.x, self.player.y, ability.range + ABILITY_NOISE,
+                                       self.dungeon.current_room_pos))
         
-        # Room transitions
-        self._check_room_transition()
+        # Doors, pickups and the staircase
+        self._check_triggers()
 
-    def _check_boss_defeat(self):
-        current_room = self.dungeon.rooms[self.dungeon.current_room_pos]
-        
-        # Check if this room had a boss that was defeated
-        if current_room.room_type == RoomType.BOSS and not current_room.boss_defeated:
-            current_room.boss_defeated = True
-            print("Boss defeated! Spawning power-up")
-            
-            # Spawn a power-up
-            power_up_type = random.choice(list(PowerUpType))
-            # power_up_type = PowerUpType.MULTI_SHOT
-            power_up = PowerUp(current_room.width // 2, current_room.height // 2, power_up_type)
-            current_room.power_ups.append(power_up)
+    def save_game(self, path: str = QUICKSAVE_PATH):
+        write_snapshot(path, save_snapshot(self))
+        self.flash_message = FlashMessage("Game Saved", 1.0)
 
-    def _check_powerup_collection(self):
-        current_room = self.dungeon.rooms[self.dungeon.current_room_pos]
-        player_rect = pygame.Rect(self.player.x - self.player.size/2, 
-                                self.player.y - self.player.size/2,
-                                self.player.size, self.player.size)
-                                
-        for power_up in current_room.power_ups[:]:
-            if not power_up.collected:
-                power_up_rect = pygame.Rect(power_up.x - power_up.size/2,
-                                        power_up.y - power_up.size/2,
-                                        power_up.size, power_up.size)
-                if player_rect.colliderect(power_up_rect):
-                    power_up.apply_effect(self.player)
-                    power_up.collected = True
-                    current_room.power_ups.remove(power_up)
-
-    def _check_staircase(self):
-        if self.dungeon.floor_completed:
-            current_room = self.dungeon.rooms[self.dungeon.current_room_pos]
-            if current_room.room_type == RoomType.BOSS and current_room.boss_defeated:
-                player_rect = pygame.Rect(self.player.x - self.player.size/2,
-                                        self.player.y - self.player.size/2,
-                                        self.player.size, self.player.size)
-                
-                # Define staircase area at center of boss room
-                staircase_rect = pygame.Rect(current_room.width // 2 - 40,
-                                        current_room.height // 2 - 40,
-                                        80, 80)
-                
-                if player_rect.colliderect(staircase_rect):
-                    print(f"Advancing from floor {self.dungeon.current_floor}")
-                    self._advance_to_next_floor()
-                    print(f"Now on floor {self.dungeon.current_floor}")
+    def load_game(self, path: str = QUICKSAVE_PATH):
+        data = read_snapshot(path) or self.quicksave
+        if data:
+            dungeon = self.dungeon
+            load_snapshot(self, data)
+            if self.dungeon is not dungeon:
+                self._setup_floor()
+            else:
+                self.alive_enemies, self.total_enemies = self.dungeon.count_enemies()
+                self.hud_dirty = True
+            self.resources.update(self.dungeon.current_room_pos)
+            self.background.focus(self.dungeon.current_room_pos)
+            self.bullets.clear()
+            self.particles.clear()
+            self.flash_message = FlashMessage("Game Loaded", 1.0)
+
+    def _on_enemy_hit(self, event: EnemyHit):
+        if event.room_pos == self.dungeon.current_room_pos:
+            self.particles.burst(event.enemy.x, event.enemy.y, 6, (255, 60, 60), speed=90, life=0.3)
+
+    def _on_enemy_died(self, event: EnemyDied):
+        room = self.dungeon.rooms.get(event.room_pos)
+        if room is None or event.enemy not in room.enemies:
+            return  # From a floor that has since been replaced
+        room.enemies.remove(event.enemy)
+        if event.room_pos == self.dungeon.current_room_pos:
+            self.particles.burst(event.enemy.x, event.enemy.y, 24 if event.enemy.is_boss else 12,
+                                 (160, 0, 0), radius=4, speed=160, life=0.6)
+        self.alive_enemies -= 1
+        self.hud_dirty = True
+        if event.enemy.is_boss:
+            self.events.post(BossDefeated(event.room_pos))
+        self._check_floor_cleared()
+
+    def _on_boss_defeated(self, event: BossDefeated):
+        room = self.dungeon.rooms[event.room_pos]
+        if room.boss_defeated:
+            return
+        room.boss_defeated = True
+        print("Boss defeated! Spawning power-up")
+
+        # Spawn a power-up
+        power_up_type = random.choice(list(PowerUpType))
+        # power_up_type = PowerUpType.MULTI_SHOT
+        power_up = PowerUp(room.width // 2, room.height // 2, power_up_type)
+        room.add_power_up(power_up)
+        self._check_floor_cleared()
+
+    def _check_floor_cleared(self):
+        boss_pos = self.dungeon.boss_pos
+        if (self.alive_enemies == 0 and not self.dungeon.floor_completed
+                and boss_pos is not None and self.dungeon.rooms[boss_pos].boss_defeated):
+            self.dungeon.floor_completed = True
+            self.events.post(FloorCleared(self.dungeon.current_floor))
+
+    def _on_floor_cleared(self, event: FloorCleared):
+        print("Floor complete! Spawning staircase")
+        self.dungeon.spawn_staircase()
+        self.flash_message = FlashMessage("Level Cleared!")
+
+    def _on_power_up_collected(self, event: PowerUpCollected):
+        room = self.dungeon.rooms[event.room_pos]
+        if event.power_up in room.power_ups:
+            room.remove_power_up(event.power_up)
+            self.particles.burst(event.power_up.x, event.power_up.y, 20, event.power_up.color, speed=200, life=0.5)
+
+    def _on_room_entered(self, event: RoomEntered):
+        self.bullets.clear()
+        self.particles.clear()
+        self.resources.update(event.room_pos)
+        self.background.focus(event.room_pos)
+        if event.direction is not None:
+            self.quicksave = save_snapshot(self)
+
+    def _on_noise(self, event: Noise):
+        room = self.dungeon.rooms[event.room_pos]
+        radius_sq = event.radius * event.radius
+        for enemy in room.enemies:
+            if not enemy.awake and (enemy.x - event.x) ** 2 + (enemy.y - event.y) ** 2 <= radius_sq:
+                enemy.wake()
 
     def _advance_to_next_floor(self):
         self.dungeon.current_floor += 1
+        if self.endless and self.dungeon.current_floor > self.dungeon.num_floors:
+            self.dungeon.current_floor = 1  # Soak runs loop through the floors forever
         current_floor = self.dungeon.current_floor
         if self.dungeon.current_floor > self.dungeon.num_floors:
             # Player has completed all floors - handle victory
@@ -208,9 +288,10 @@ class Game:
             print("Congratulations! You've completed all floors!")
         else:
             # Generate new floor
-            self.dungeon = DungeonMap(size=8, num_floors=self.dungeon.num_floors)
+            with self.profiler.section("generation"):
+                self.dungeon = self._create_floor(self.config.floor_size, self.dungeon.num_floors)
             self.dungeon.current_floor = current_floor
-            self.minimap = Minimap(self.dungeon)
+            self._setup_floor()
             
             # Reset player position but keep upgrades
             current_room = self.dungeon.rooms[self.dungeon.current_room_pos]
@@ -222,10 +303,14 @@ class Game:
             
             # Mark starting room as explored
             self.dungeon.rooms[self.dungeon.current_room_pos].explored = True
+            self.events.post(RoomEntered(self.dungeon.current_room_pos))
     
     def update(self):
         # Calculate delta time
         dt = self.clock.get_time() / 1000  # Convert milliseconds to seconds
+
+        # Deliver what happened during input (room transitions) before this tick
+        self.events.dispatch()
         
         current_room = self.dungeon.rooms[self.dungeon.current_room_pos]
         
@@ -235,241 +320,156 @@ class Game:
         # Update abilities 
         self.player.update_ability_effects(current_room.enemies, dt)
 
-        for ability in self.player.abilities.values():
-            ability.update(dt)
+        # Effect animations may be advanced less often at lower quality
+        self.ticks += 1
+        self.effect_dt += dt
+        if self.ticks % self.quality.settings.effect_frame_step == 0:
+            for ability in self.player.abilities.values():
+                ability.update(self.effect_dt)
+            self.effect_dt = 0.0
 
         # Update projectiles
-        self.player.update_projectiles(current_room.enemies, current_room.walls)
+        with self.profiler.section("projectiles"):
+            self.player.update_projectiles(current_room.enemies, current_room.wall_index)
+            for projectile in self.player.projectiles:
+                self.particles.trail(projectile.x, projectile.y, (255, 220, 80))
+
+        # What the player can see, for the fog and for the enemies' line of sight
+        with self.profiler.section("visibility"):
+            if self.visibility is None or self.visibility.occupancy is not current_room.occupancy:
+                self.visibility = VisibilityMap(current_room.occupancy)
+            self.visibility.update(self.player.x, self.player.y)
 
         # Update enemies
-        for enemy in current_room.enemies[:]:
-            enemy.move_toward_player(self.player, current_room.walls)
-            enemy.attack_player(self.player)
-            if enemy.is_dead():
-                if enemy.is_boss:
-                    self._check_boss_defeat()  # Handle boss defeat
-                current_room.enemies.remove(enemy)
-                # Check if all enemies are gone after each enemy death
-                if self.dungeon.is_floor_complete() and any(room.room_type == RoomType.BOSS and room.boss_defeated 
-                                                        for room in self.dungeon.rooms.values()):
-                    if not self.dungeon.floor_completed:
-                        self.dungeon.floor_completed = True
-                        print("Floor complete! Spawning staircase")
-                        self.dungeon.spawn_staircase()
-                        self.flash_message = FlashMessage("Level Cleared!")
+        with self.profiler.section("enemies"):
+            self._update_enemies(current_room, dt)
+        
+        with self.profiler.section("bullets"):
+            self.player.health -= self.bullets.update(self.player.x, self.player.y)
+        self.profiler.count("bullets", self.bullets.count)
+        
+        with self.profiler.section("particles"):
+            self.particles.density = self.quality.settings.particle_density
+            self.particles.update(dt)
+        
+        # The rest of the floor, at reduced detail and within its own time budget
+        with self.profiler.section("background"):
+            self.background.update(dt)
         
         # Update power-ups
         for power_up in current_room.power_ups:
             power_up.update()
-        
-        # Check for power-up collection
-        self._check_powerup_collection()
-        
-        # Check for staircase/next floor
-        self._check_staircase()
 
-    def draw(self):
-        self.screen.fill((0, 0, 0))
-        
-        current_room = self.dungeon.rooms[self.dungeon.current_room_pos]
+        # Deaths, pickups, floor progress and room changes raised during this tick
+        self.events.dispatch()
 
-        # Update camera to follow player
-        self.camera.update(self.player.x, self.player.y, current_room.width, current_room.height)
-        
-        # Draw floor tiles
-        for row in range(len(current_room.floor_grid)):
-            for col in range(len(current_room.floor_grid[row])):
-                tile_idx = current_room.floor_grid[row][col]
-                tile = current_room.floor_tiles[tile_idx]
-                
-                # Calculate world position
-                world_x = col * current_room.floor_tile_size
-                world_y = row * current_room.floor_tile_size
-                
-                # Apply camera offset
-                screen_x, screen_y = self.camera.apply(world_x, world_y)
-                
-                # Only draw tiles that are in the camera view
-                if (-current_room.floor_tile_size <= screen_x <= self.width and
-                    -current_room.floor_tile_size <= screen_y <= self.height):
-                    self.screen.blit(tile, (screen_x, screen_y))
-
-        # Draw walls with camera offset
-        for wall in current_room.walls:
-            # Create a copy of the wall rect with camera offset
-            cam_wall = pygame.Rect(
-                wall.x - self.camera.x,
-                wall.y - self.camera.y,
-                wall.width,
-                wall.height
-            )
-            pygame.draw.rect(self.screen, (128, 128, 128), cam_wall)
-        
-        # Draw ability effects
-        for ability_name, ability in self.player.abilities.items():
-            if ability.should_show_effect():
-                if ability_name == "aoe":
-                    current_frame = ability.get_current_frame()
-                    if current_frame:
-                        player_screen_pos = self.camera.apply(self.player.x, self.player.y)
-                        frame_rect = current_frame.get_rect(center=player_screen_pos)
-                        self.screen.blit(current_frame, frame_rect)
-                        pygame.draw.circle(self.screen, (255, 255, 0, 64),
-                                    (int(player_screen_pos[0]), int(player_screen_pos[1])),
-                                    ability.range, 2)
-                            
-                elif ability_name == "cone":
-                    # Draw cone AOE with camera offset
-                    points = []
-                    cone_angle = pi / 2  # 90 degrees
-                    start_angle = self.player.direction - cone_angle / 2
-                    end_angle = self.player.direction + cone_angle / 2
-                    
-                    # Get player screen position
-                    player_screen_pos = self.camera.apply(self.player.x, self.player.y)
-                    points.append(player_screen_pos)
-                    
-                    # Add points along the arc
-                    for i in range(21):
-                        angle = start_angle + (i / 20) * cone_angle
-                        world_x = self.player.x + cos(angle) * ability.range
-                        world_y = self.player.y + sin(angle) * ability.range
-                        screen_x, screen_y = self.camera.apply(world_x, world_y)
-                        points.append((screen_x, screen_y))
-                    
-                    # Close the shape
-                    points.append(player_screen_pos)
-                    
-                    # Draw cone
-                    pygame.draw.polygon(self.screen, (255, 165, 0, 128), points, 2)
-                    
-                # elif ability_name == "projectile":
-                #     # Draw projectile trajectory line with camera offset
-                #     player_screen_pos = self.camera.apply(self.player.x, self.player.y)
-                #     world_end_x = self.player.x + cos(self.player.direction) * ability.range
-                #     world_end_y = self.player.y + sin(self.player.direction) * ability.range
-                #     end_screen_x, end_screen_y = self.camera.apply(world_end_x, world_end_y)
-                    
-                #     pygame.draw.line(self.screen, (255, 255, 0, 128),
-                #                 player_screen_pos,
-                #                 (end_screen_x, end_screen_y), 2)
-        
-        # Draw projectiles with camera offset
-        for projectile in self.player.projectiles:
-            proj_screen_x, proj_screen_y = self.camera.apply(projectile.x, projectile.y)
-            pygame.draw.circle(self.screen, (255, 255, 0), 
-                            (int(proj_screen_x), int(proj_screen_y)), 5)
-            
-        # Draw enemies with camera offset
+    def _update_enemies(self, current_room: Room, dt: float):
+        # Decisions within their budget, then every enemy acts on its latest one
+        self.ai.update(current_room, self.player, self.visibility, dt)
+        self.profiler.count("ai decisions", self.ai.decisions)
+        self.profiler.count("ai deferred", self.ai.deferred)
+
+        # Dead enemies are removed by _on_enemy_died when the bus is dispatched
         for enemy in current_room.enemies:
-            enemy_screen_x, enemy_screen_y = self.camera.apply(enemy.x, enemy.y)
-            if enemy.is_boss:
-                color = (255, 0, 0) if enemy.health > enemy.max_health / 2 else (200, 0, 0)
-                pygame.draw.rect(self.screen, color,
-                            pygame.Rect(enemy_screen_x - enemy.size/2, 
-                                        enemy_screen_y - enemy.size/2,
-                                        enemy.size, enemy.size))
-            else:
-                current_frame = enemy.get_current_frame()
-                frame_rect = current_frame.get_rect(center=(enemy_screen_x, enemy_screen_y))
-                self.screen.blit(current_frame, frame_rect)
-
-            # Draw enemy health bar
-            health_width = (enemy.health / enemy.max_health) * enemy.size
-            pygame.draw.rect(self.screen, (0, 255, 0),
-                        pygame.Rect(enemy_screen_x - enemy.size/2,
-                                    enemy_screen_y - enemy.size/2 - 10,
-                                    health_width, 5))
-        # After drawing enemies and before drawing player...
-
-        # Draw power-ups
-        for power_up in current_room.power_ups:
-            power_up_size = power_up.get_display_size()
-            power_up_screen_x, power_up_screen_y = self.camera.apply(power_up.x, power_up.y)        
-            pygame.draw.circle(self.screen, power_up.color,
-                            (int(power_up_screen_x), int(power_up_screen_y)),
-                            int(power_up_size))
-
-        # Draw staircase if floor is complete
-        if self.dungeon.floor_completed:
-            for pos, room in self.dungeon.rooms.items():
-                if room.room_type == RoomType.BOSS and room.boss_defeated:
-                    if pos == self.dungeon.current_room_pos:
-                        stair_x, stair_y = self.camera.apply(room.width // 2, room.height // 2)
-                        # Draw staircase sprite
-                        stair_rect = self.staircase_sprite.get_rect(
-                            center=(stair_x, stair_y)
-                        )
-                        self.screen.blit(self.staircase_sprite, stair_rect)
-
-        # Draw player with camera offset
-        player_screen_x, player_screen_y = self.camera.apply(self.player.x, self.player.y)
-
-        # Get current frame
-        current_frame = self.player.get_current_frame()
-        frame_rect = current_frame.get_rect(center=(player_screen_x, player_screen_y))
-        self.screen.blit(current_frame, frame_rect)
-
-        # Direction indicator is still useful for abilities
-        end_world_x = self.player.x + cos(self.player.direction) * 20
-        end_world_y = self.player.y + sin(self.player.direction) * 20
-        end_screen_x, end_screen_y = self.camera.apply(end_world_x, end_world_y)
-                
-        pygame.draw.line(self.screen, (0, 255, 0),
-                        (player_screen_x, player_screen_y),
-                        (end_screen_x, end_screen_y), 2)
-        
-        # UI elements (not affected by camera)
-        # Draw player health bar
-        health_width = (self.player.health / 100) * 200
-        pygame.draw.rect(self.screen, (0, 255, 0),
-                        pygame.Rect(10, 10, health_width, 20))
-
-        # Draw floor indicator
-        font = pygame.font.SysFont(None, 36)
-        floor_text = f"Floor: {self.dungeon.current_floor}/{self.dungeon.num_floors}"
-        text_surface = font.render(floor_text, True, (255, 255, 255))
-        self.screen.blit(text_surface, (self.width - 150, 10))
-        
-        # Draw enemy counter
-        alive_enemies, total_enemies = self.dungeon.count_enemies()
-        enemy_text = f"Enemies: {alive_enemies}/{total_enemies}"
-        enemy_surface = font.render(enemy_text, True, (255, 255, 255))
-        self.screen.blit(enemy_surface, (self.width - 150, 50))
-
-        # Draw ability cooldowns
-        y = 40
-        for name, ability in self.player.abilities.items():
-            if ability.is_ready():
-                color = (0, 255, 0)
-            else:
-                color = (255, 0, 0)
-            pygame.draw.rect(self.screen, color,
-                        pygame.Rect(10, y, 20, 20))
-            y += 30
-        
-        # Draw minimap (not affected by camera)
-        self.minimap.draw(self.screen)
+            if enemy.health > 0 and enemy.awake:
+                self.ai.act(enemy, current_room, self.player)
+        # Spread out before attacking, so only the enemies actually reaching
+        # the player hit it rather than a whole stack at once
+        self.ai.separate(current_room)
+        self.profiler.count("ai neighbour checks", self.ai.neighbour_checks)
 
-        # Draw flash message if active
-        if self.flash_message and self.flash_message.is_active():
-            self.flash_message.draw(self.screen)
-        
-        pygame.display.flip()
-    
-    def run(self):
+        # Animation is only a visual, so enemies outside the view can skip it
+        animate_all = self.quality.settings.offscreen_animation
+        reach_x = self.width // 2 + 64
+        reach_y = self.height // 2 + 64
+        for enemy in current_room.enemies:
+            if enemy.health > 0 and enemy.awake:
+                enemy.attack_player(self.player)
+                if enemy.pattern is not None:
+                    self._fire_pattern(enemy, current_room, dt)
+                if animate_all or (abs(enemy.x - self.player.x) < reach_x and
+                                   abs(enemy.y - self.player.y) < reach_y):
+                    enemy.update_animation(dt)
+
+    def _fire_pattern(self, enemy: Enemy, room: Room, dt: float):
+        if not enemy.patterns:
+            enemy.patterns = boss_patterns(self.dungeon.current_floor)
+        half = enemy.size / 2
+        if (enemy.pattern in ("ring", "spiral") and abs(self.player.x - enemy.x) < half + BulletField.player_hitbox
+                and abs(self.player.y - enemy.y) < half + BulletField.player_hitbox):
+            # The player is in the boss's body, where a volley can't miss; melee covers it
+            return
+        # Bullets start just outside the boss instead of at its center
+        enemy.patterns[enemy.pattern].update(dt, self.bullets, (enemy.x, enemy.y),
+                                             (self.player.x, self.player.y), room.wall_index,
+                                             clearance=half + BulletField.radius)
+
+    def draw(self):
+        self.renderer.draw()
+
+    def run(self, fps: int = 60, max_frames: Optional[int] = None, soak: Optional[SoakMonitor] = None):
+        frames = 0
+        self.quality.target = 1 / fps if fps else 1 / 60
         while self.running:
+            frame_start = time()
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     self.running = False
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+                    self.save_game()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F9:
+                    self.load_game()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    self.profiler.show_overlay = not self.profiler.show_overlay
                     
-            self.handle_input()
-            self.update()
-            self.draw()
-            self.clock.tick(60)
+            with self.profiler.section("input"):
+                self.handle_input()
+            with self.profiler.section("update"):
+                self.update()
+            with self.profiler.section("draw"):
+                self.draw()
+            if frames == 0:
+                startup.mark("first frame")
+            with self.profiler.section("streaming"):
+                self.stream_assets()
+            self.quality.record(time() - frame_start)
+            self.profiler.end_frame()
+            if soak:
+                soak.record(time() - frame_start, self)
+            self.clock.tick(fps)
+
+            frames += 1
+            if max_frames is not None and frames >= max_frames:
+                self.running = False
             
         pygame.quit()
 
+    def profile_report(self) -> str:
+        # Timings, then what each room on the current floor keeps resident
+        return self.profiler.summary() + "\n" + self.resources.format_report()
+
 if __name__ == "__main__":
-    game = Game()
-    game.run()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bot", action="store_true", help="let the autoplay bot drive the player")
+    parser.add_argument("--frames", type=int, default=None, help="quit after this many frames")
+    parser.add_argument("--fps", type=int, default=60, help="frame cap, 0 for uncapped")
+    parser.add_argument("--soak", action="store_true", help="endless floors with frame time/memory logging")
+    parser.add_argument("--memory-budget", type=int, default=32, help="room render data budget in MB")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="default", help="floor and room size preset")
+    parser.add_argument("--profile", action="store_true", help="show the profiling overlay and print timings on exit")
+    parser.add_argument("--seed", type=int, default=None, help="run seed; seeded floors are cached on disk")
+    parser.add_argument("--renderer", choices=sorted(RENDERERS), default="topdown", help="view to draw the game with")
+    parser.add_argument("--startup-report", action="store_true", help="print cold-start timings after the first frame")
+    args = parser.parse_args()
+
+    game = Game(controller=BotController() if args.bot else None, endless=args.soak,
+                memory_budget=args.memory_budget * 1024 * 1024, config=PRESETS[args.preset],
+                seed=args.seed, renderer=args.renderer)
+    game.profiler.show_overlay = args.profile
+    if args.startup_report:
+        game.defer(lambda: print(startup.report()))
+    game.run(fps=args.fps, max_frames=args.frames, soak=SoakMonitor() if args.soak else None)
+    if args.profile:
+        print(game.profile_report())
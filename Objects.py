@@ -11,6 +11,15 @@ from typing import List, Optional
 import pygame
 from time import time
 
+from Spatial import WallIndex, OccupancyGrid, VisibilityMap, Trigger, TriggerIndex, merge_rects
+from Bullets import Emitter
+from Events import EventBus, EnemyDied, EnemyHit
+from Assets import *
+
+def surface_bytes(surface: pygame.Surface) -> int:
+    """Approximate pixel memory held by a surface."""
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
 @dataclass
 class AnimationFrame:
     surface: pygame.Surface
@@ -73,15 +82,18 @@ class Ability:
         self.duration = 0.5
         self.current_animation: Optional[AbilityAnimation] = None
         
+        # Effect frames are not needed for the first frame; Game streams them
+        # in through load_animation() and use() plays nothing until then
+        self.animation_frames: List[AnimationFrame] = []
+
+    def load_animation(self):
         # Load animation frames for AOE ability
-        if name == "Circle of Damage":
+        if self.name == "Circle of Damage" and not self.animation_frames:
             self.animation_frames = self._load_aoe_animation()
-        else:
-            self.animation_frames = []
     
     def _load_aoe_animation(self) -> List[AnimationFrame]:
         # Load your AOE effect spritesheet
-        spritesheet = pygame.image.load("tiles/player.png").convert_alpha()
+        spritesheet = assets.get(EFFECT_SHEET)
         frames = []
         
         # Assuming the spritesheet has 8 64x64 frames horizontally
@@ -154,15 +166,30 @@ class Projectile:
         self.range = range
         self.distance_traveled = 0
         self.active = True
-        
+        # Set by cast(): where the flight started and where it ends, at a wall or out of range
+        self.walls: Optional[WallIndex] = None
+        self.origin = (x, y)
+        self.stop_distance = float(range)
+
+    def cast(self, walls: WallIndex):
+        """Find, once, how far the rest of the flight gets before hitting a wall.
+
+        Walls never move, so this is the only wall test the projectile needs,
+        and it is exact however far a tick moves it.
+        """
+        dx = cos(self.direction)
+        dy = sin(self.direction)
+        self.walls = walls
+        self.origin = (self.x - dx * self.distance_traveled, self.y - dy * self.distance_traveled)
+        self.stop_distance = self.distance_traveled + walls.raycast(
+            (self.x, self.y), (dx, dy), max(0, self.range - self.distance_traveled), 5)
+
     def update(self):
-        dx = cos(self.direction) * self.speed
-        dy = sin(self.direction) * self.speed
-        self.x += dx
-        self.y += dy
-        self.distance_traveled += sqrt(dx * dx + dy * dy)
-        
-        if self.distance_traveled >= self.range:
+        self.distance_traveled = min(self.distance_traveled + self.speed, self.stop_distance)
+        self.x = self.origin[0] + cos(self.direction) * self.distance_traveled
+        self.y = self.origin[1] + sin(self.direction) * self.distance_traveled
+
+        if self.distance_traveled >= self.stop_distance:
             self.active = False
 
 class PlayerState:
@@ -186,7 +213,7 @@ class Player:
         # row1-3=idle, row4=running
         # row5=running right, row6=running back
         # row7=fwd attack, row8=right atk, 9=back atk
-        self.spritesheet = pygame.image.load("sprites/characters/player.png").convert_alpha()
+        self.spritesheet = assets.get(PLAYER_SHEET)
         self.frame_width = 16  # Looks like 16x16 tiles based on your image
         self.frame_height = 20
         self.sprite_offset_x = 16  # Horizontal offset if sprites don't start at left edge
@@ -394,7 +421,7 @@ class Player:
                 
         # ability.use()
 
-    def move(self, dx: int, dy: int, walls: List[pygame.Rect]):
+    def move(self, dx: int, dy: int, walls: WallIndex):
         # Normalize diagonal movement by scaling the speed
         length = (dx * dx + dy * dy) ** 0.5  # Calculate vector length
         if length > 0:  # Avoid division by zero
@@ -408,7 +435,7 @@ class Player:
         player_rect = pygame.Rect(new_x - self.size/2, new_y - self.size/2, self.size, self.size)
         
         # Try diagonal movement first
-        if not any(player_rect.colliderect(wall) for wall in walls):
+        if not walls.collides(player_rect):
             self.x = new_x
             self.y = new_y
         else:
@@ -419,7 +446,7 @@ class Player:
                 self.size, 
                 self.size
             )
-            if dx != 0 and not any(horizontal_rect.colliderect(wall) for wall in walls):
+            if dx != 0 and not walls.collides(horizontal_rect):
                 self.x = new_x
                 
             # Try vertical movement
@@ -429,7 +456,7 @@ class Player:
                 self.size, 
                 self.size
             )
-            if dy != 0 and not any(vertical_rect.colliderect(wall) for wall in walls):
+            if dy != 0 and not walls.collides(vertical_rect):
                 self.y = new_y
                 
         # Update animation based on movement
@@ -439,15 +466,14 @@ class Player:
         if dx != 0 or dy != 0:
             self.direction = atan2(dy, dx)
                 
-    def update_projectiles(self, enemies: List['Enemy'], walls: List[pygame.Rect]):
+    def update_projectiles(self, enemies: List['Enemy'], walls: WallIndex):
         for projectile in self.projectiles[:]:
+            # New shots, and shots carried into another room or out of a saved game
+            if projectile.walls is not walls:
+                projectile.cast(walls)
             projectile.update()
             
-            # Check wall collisions
             proj_rect = pygame.Rect(projectile.x - 5, projectile.y - 5, 10, 10)
-            if any(proj_rect.colliderect(wall) for wall in walls):
-                projectile.active = False
-                
             # Check enemy collisions
             for enemy in enemies:
                 enemy_rect = pygame.Rect(enemy.x - enemy.size/2, 
@@ -579,20 +605,52 @@ class Enemy:
         self.attack_cooldown = 1.0
         self.last_attack = 0
         self.is_boss = is_boss
+        self.spawn_id = 0  # Position in the room's spawn order, used by saved games
+        self.events: Optional[EventBus] = None
+        self.home_pos: Tuple[int, int] = (0, 0)  # Room it spawned in, spawn_id indexes that room
+        self.room_pos: Tuple[int, int] = (0, 0)  # Room it is in now, enemies can move between rooms
+        self.heading_out: Optional['Direction'] = None  # Door it is walking to while off-screen
+        self.roam_target: Optional[Tuple[float, float]] = None
+        # Dormant enemies skip steering, attacks and animation until they notice the player
+        self.awake = False
+        self.unseen_time = 0.0  # Seconds awake without seeing the player
+        # Last decision of the AI scheduler, carried out every tick until the next one
+        self.next_think = 0.0
+        self.last_think: Optional[float] = None
+        self.waypoint: Optional[Tuple[int, int]] = None  # None chases the player directly
+        self.tactic = "chase"
+        self.pattern: Optional[str] = None  # Bosses: which of their patterns is firing, if any
+        self.patterns: Dict[str, Emitter] = {}
         self.sprite_offset_x = 8
         self.sprite_offset_y = 8
         
-        if not is_boss:
-            # Animation properties
-            self.spritesheet = pygame.image.load("sprites/characters/32x32/Char_006.png").convert_alpha()
-            self.frame_width = 32
-            self.frame_height = 32
-            self.animations = self._load_animations()
-            self.current_animation = 'walk_down'
-            self.frame_index = 0
-            self.animation_speed = 0.1
-            self.animation_timer = 0
-            self.direction = 0  # Current facing direction in radians
+        # Animation properties
+        self.spritesheet: Optional[pygame.Surface] = None
+        self.animations: Optional[Dict[str, List[pygame.Surface]]] = None
+        self.frame_width = 32
+        self.frame_height = 32
+        self.current_animation = 'walk_down'
+        self.frame_index = 0
+        self.animation_speed = 0.1
+        self.animation_timer = 0
+        self.direction = 0  # Current facing direction in radians
+
+    def load_render_data(self):
+        # Frames are loaded on demand so rooms far from the player don't hold them
+        if self.is_boss or self.animations is not None:
+            return
+        self.spritesheet = assets.get(ENEMY_SHEET)  # Shared by every enemy
+        self.animations = self._load_animations()
+
+    def release_render_data(self):
+        self.spritesheet = None
+        self.animations = None
+
+    def render_data_bytes(self) -> int:
+        if self.animations is None:
+            return 0
+        # The sheet itself belongs to the asset loader, only the frames are ours
+        return sum(surface_bytes(frame) for frames in self.animations.values() for frame in frames)
         
     def _load_animations(self):
         animations = {
@@ -627,7 +685,7 @@ class Enemy:
         return pygame.transform.scale(frame, (self.size, self.size))
     
     def update_animation(self, dt: float):
-        if self.is_boss:
+        if self.is_boss or self.animations is None:
             return
             
         self.animation_timer += dt
@@ -639,6 +697,7 @@ class Enemy:
         if self.is_boss:
             return None
             
+        self.load_render_data()
         return self.animations[self.current_animation][self.frame_index]
     
     def set_animation_based_on_movement(self, dx: float, dy: float):
@@ -659,32 +718,46 @@ class Enemy:
             else:
                 self.current_animation = 'walk_up'
         
+    def wake(self):
+        self.awake = True
+        self.unseen_time = 0.0
+
     def take_damage(self, amount: int):
+        was_alive = self.health > 0
+        self.wake()
         self.health -= amount
+        if was_alive and self.events:
+            self.events.post(EnemyHit(self, amount, self.room_pos))
+            if self.health <= 0:
+                self.events.post(EnemyDied(self, self.room_pos))
         
     def is_dead(self) -> bool:
         return self.health <= 0
         
-    def move_toward_player(self, player: Player, walls: List[pygame.Rect]):
-        dx = player.x - self.x
-        dy = player.y - self.y
+    def move_toward(self, x: float, y: float, walls: WallIndex) -> bool:
+        """Step towards (x, y), sliding along walls. True once there."""
+        dx = x - self.x
+        dy = y - self.y
         distance = sqrt(dx * dx + dy * dy)
-        
-        if distance > 0:
-            dx = dx / distance * self.speed
-            dy = dy / distance * self.speed
-            
-            new_x = self.x + dx
-            new_y = self.y + dy
-            enemy_rect = pygame.Rect(new_x - self.size/2, new_y - self.size/2, 
-                                   self.size, self.size)
-            
-            if not any(enemy_rect.colliderect(wall) for wall in walls):
-                self.x = new_x
-                self.y = new_y
+        if distance <= self.speed:
+            if not walls.collides(pygame.Rect(x - self.size/2, y - self.size/2, self.size, self.size)):
+                self.x = x
+                self.y = y
+            return True
+
+        dx = dx / distance * self.speed
+        dy = dy / distance * self.speed
+        for move_x, move_y in ((dx, dy), (dx, 0), (0, dy)):
+            enemy_rect = pygame.Rect(self.x + move_x - self.size/2, self.y + move_y - self.size/2,
+                                     self.size, self.size)
+            if not walls.collides(enemy_rect):
+                self.x += move_x
+                self.y += move_y
                 if not self.is_boss:
-                    self.set_animation_based_on_movement(dx, dy)
-                
+                    self.set_animation_based_on_movement(move_x, move_y)
+                break
+        return False
+
     def attack_player(self, player: Player) -> bool:
         if time() - self.last_attack >= self.attack_cooldown:
             distance = sqrt((player.x - self.x)**2 + (player.y - self.y)**2)
@@ -0,0 +1,118 @@
+import random
+from array import array
+from math import cos, pi, sin
+from typing import Dict, List, Tuple
+
+Color = Tuple[int, int, int]
+
+FADE_STEPS = 4  # Pre-rendered alpha levels per particle kind
+
+class ParticleSystem:
+    """Short-lived visual particles in a fixed pool of parallel arrays.
+
+    Slots are handed out round-robin, so the pool is a ring in spawn order:
+    when it is full a new particle takes the oldest one's slot instead of
+    growing the pool. Each update integrates the whole ring in one loop and
+    then drops expired particles off the old end.
+
+    A kind is a (colour, radius) pair; renderers pre-render FADE_STEPS faded
+    sprites per kind and pick one by age, so drawing is all blits.
+    """
+    drag = 3.0  # Fraction of its speed a particle loses per second, roughly
+
+    def __init__(self, capacity: int = 1024, seed=None):
+        self.capacity = capacity
+        self.x = array('f', bytes(4 * capacity))
+        self.y = array('f', bytes(4 * capacity))
+        self.vx = array('f', bytes(4 * capacity))
+        self.vy = array('f', bytes(4 * capacity))
+        self.age = array('f', bytes(4 * capacity))
+        self.life = array('f', bytes(4 * capacity))
+        self.kind = array('B', bytes(capacity))
+        self.kinds: List[Tuple[Color, int]] = []
+        self._kind_ids: Dict[Tuple[Color, int], int] = {}
+        self.tail = 0  # Slot of the oldest particle
+        self.size = 0  # Slots in use from the tail on, including expired ones not yet dropped
+        self.density = 1.0  # Share of requested particles actually emitted, set from quality
+        self.recycled = 0  # Particles cut short to make room, all time
+        # Visual only, so keep it off the gameplay random stream
+        self.rng = random.Random(seed)
+
+    def kind_of(self, color: Color, radius: int) -> int:
+        key = (color, radius)
+        kind = self._kind_ids.get(key)
+        if kind is None:
+            kind = len(self.kinds)
+            self.kinds.append(key)
+            self._kind_ids[key] = kind
+        return kind
+
+    def spawn(self, x: float, y: float, vx: float, vy: float, life: float, kind: int):
+        if self.size == self.capacity:
+            # Full: the oldest particle gives up its slot
+            self.tail = (self.tail + 1) % self.capacity
+            self.size -= 1
+            self.recycled += 1
+        i = (self.tail + self.size) % self.capacity
+        self.x[i] = x
+        self.y[i] = y
+        self.vx[i] = vx
+        self.vy[i] = vy
+        self.age[i] = 0.0
+        self.life[i] = life
+        self.kind[i] = kind
+        self.size += 1
+
+    def burst(self, x: float, y: float, count: int, color: Color, radius: int = 3,
+              speed: float = 120, life: float = 0.4):
+        """count particles flying out of (x, y) in random directions."""
+        kind = self.kind_of(color, radius)
+        rng = self.rng
+        for _ in range(round(count * self.density)):
+            angle = rng.uniform(0, 2 * pi)
+            velocity = speed * rng.uniform(0.3, 1.0)
+            self.spawn(x, y, cos(angle) * velocity, sin(angle) * velocity,
+                       life * rng.uniform(0.6, 1.0), kind)
+
+    def trail(self, x: float, y: float, color: Color, radius: int = 2, life: float = 0.2):
+        """One particle left standing where something passed."""
+        if self.rng.random() < self.density:
+            self.spawn(x, y, 0.0, 0.0, life, self.kind_of(color, radius))
+
+    def update(self, dt: float):
+        xs, ys, vxs, vys, ages, lives = self.x, self.y, self.vx, self.vy, self.age, self.life
+        damping = max(0.0, 1.0 - self.drag * dt)
+        capacity = self.capacity
+        i = self.tail
+        for _ in range(self.size):
+            age = ages[i]
+            if age < lives[i]:
+                ages[i] = age + dt
+                xs[i] += vxs[i] * dt
+                ys[i] += vys[i] * dt
+                vxs[i] *= damping
+                vys[i] *= damping
+            i += 1
+            if i == capacity:
+                i = 0
+
+        # Spawned in order with similar lifetimes, so expired ones collect at the tail
+        while self.size and ages[self.tail] >= lives[self.tail]:
+            self.tail = (self.tail + 1) % capacity
+            self.size -= 1
+
+    def live(self):
+        """(x, y, kind, fade step) of every live particle, oldest first."""
+        xs, ys, kinds, ages, lives = self.x, self.y, self.kind, self.age, self.life
+        capacity = self.capacity
+        i = self.tail
+        for _ in range(self.size):
+            age = ages[i]
+            if age < lives[i]:
+                yield xs[i], ys[i], kinds[i], int(age / lives[i] * FADE_STEPS)
+            i += 1
+            if i == capacity:
+                i = 0
+
+    def clear(self):
+        self.size = 0
@@ -0,0 +1,88 @@
+from collections import defaultdict
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+import pygame
+
+
+class _Section:
+    def __init__(self, profiler: 'Profiler', name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+
+    def __exit__(self, *exc):
+        elapsed = perf_counter() - self.start
+        self.profiler.current[self.name] += elapsed
+        self.profiler.totals[self.name] += elapsed
+
+class Profiler:
+    """Per-frame section timings with a rolling average and an on-screen overlay."""
+    def __init__(self, window: int = 60):
+        self.window = window
+        self.current: Dict[str, float] = defaultdict(float)
+        self.history: Dict[str, List[float]] = defaultdict(list)
+        self.totals: Dict[str, float] = defaultdict(float)  # All-time, for one-off work like generation
+        self.counters: Dict[str, float] = {}
+        self.show_overlay = False
+        self.font = None
+
+    def section(self, name: str) -> _Section:
+        return _Section(self, name)
+
+    def count(self, name: str, value: float):
+        self.counters[name] = value
+
+    def end_frame(self):
+        for name in set(self.history) | set(self.current):
+            samples = self.history[name]
+            samples.append(self.current.get(name, 0.0))
+            if len(samples) > self.window:
+                del samples[0]
+        self.current = defaultdict(float)
+
+    def averages(self) -> Dict[str, float]:
+        return {name: sum(samples) / len(samples) for name, samples in self.history.items() if samples}
+
+    def summary(self) -> str:
+        lines = [f"{name}: {average * 1000:.3f}ms avg, {self.totals[name]:.2f}s total"
+                 for name, average in sorted(self.averages().items())]
+        lines += [f"{name}: {value}" for name, value in sorted(self.counters.items())]
+        return "\n".join(lines)
+
+    def draw_overlay(self, screen: pygame.Surface):
+        if not self.show_overlay:
+            return
+        if self.font is None:
+            self.font = pygame.font.SysFont(None, 20)
+        y = screen.get_height() - 20
+        for line in reversed(self.summary().splitlines()):
+            screen.blit(self.font.render(line, True, (255, 255, 255)), (10, y))
+            y -= 16
+
+COLD_START_BUDGET = 0.5  # Seconds from launch to the first frame on screen
+
+class StartupTimer:
+    """Wall-clock marks from launch to the first frame, checked against a budget."""
+    def __init__(self, start: Optional[float] = None, budget: float = COLD_START_BUDGET):
+        self.start = perf_counter() if start is None else start
+        self.budget = budget
+        self.marks: List[Tuple[str, float]] = []
+
+    def mark(self, name: str):
+        self.marks.append((name, perf_counter()))
+
+    def total(self) -> float:
+        return self.marks[-1][1] - self.start if self.marks else 0.0
+
+    def report(self) -> str:
+        lines = []
+        previous = self.start
+        for name, when in self.marks:
+            lines.append(f"{name}: {(when - previous) * 1000:.1f}ms")
+            previous = when
+        verdict = "within" if self.total() <= self.budget else "OVER"
+        lines.append(f"startup: {self.total() * 1000:.1f}ms, {verdict} the {self.budget * 1000:.0f}ms budget")
+        return "\n".join(lines)
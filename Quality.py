@@ -0,0 +1,58 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List
+
+
+@dataclass
+class QualityLevel:
+    name: str
+    effect_sprites: bool       # Alpha-blended AoE frames; outline only when off
+    effect_frame_step: int     # Advance effect animations every n-th frame
+    health_bars: str           # "all", "damaged" or "none"
+    minimap_interval: int      # Frames between minimap redraws
+    offscreen_animation: bool  # Keep animating enemies outside the view
+    particle_density: float    # Share of effect particles emitted
+
+QUALITY_LEVELS: List[QualityLevel] = [
+    QualityLevel("high", True, 1, "all", 1, True, 1.0),
+    QualityLevel("medium", True, 1, "all", 4, False, 1.0),
+    QualityLevel("low", True, 2, "damaged", 8, False, 0.5),
+    QualityLevel("minimum", False, 4, "none", 15, False, 0.25),
+]
+
+class QualityController:
+    """Steps optional rendering and animation work down when recent frames run
+    over the target, and back up once there is clear headroom again.
+
+    Frame times are the game's own work per frame, without the clock's sleep.
+    Changes wait for a full window of samples so one slow frame (a floor
+    being generated, say) does not flip the level.
+    """
+    def __init__(self, target_frame_time: float = 1 / 60, window: int = 30):
+        self.target = target_frame_time
+        self.window = window
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.level = 0
+        self.frames_since_change = 0
+
+    @property
+    def settings(self) -> QualityLevel:
+        return QUALITY_LEVELS[self.level]
+
+    def record(self, frame_time: float):
+        self.samples.append(frame_time)
+        self.frames_since_change += 1
+        if self.frames_since_change < self.window or len(self.samples) < self.window:
+            return
+
+        average = sum(self.samples) / len(self.samples)
+        if average > self.target and self.level < len(QUALITY_LEVELS) - 1:
+            self._change(self.level + 1)
+        elif average < self.target * 0.5 and self.level > 0 and self.frames_since_change >= self.window * 4:
+            # Step back up slowly, and only with plenty of room, to avoid oscillating
+            self._change(self.level - 1)
+
+    def _change(self, level: int):
+        self.level = level
+        self.frames_since_change = 0
+        self.samples.clear()
@@ -0,0 +1,563 @@
+from collections import OrderedDict
+
+from Dungeon import *
+from Rendering import *
+from Particles import FADE_STEPS
+
+
+def cart_to_iso(x, y):
+    """Convert Cartesian coordinates to isometric screen coordinates"""
+    iso_x = (x - y)
+    iso_y = (x + y) / 2
+    return iso_x, iso_y
+
+def iso_to_cart(iso_x, iso_y):
+    """Convert isometric screen coordinates back to Cartesian coordinates"""
+    x = (iso_x + 2 * iso_y) / 2
+    y = (2 * iso_y - iso_x) / 2
+    return x, y
+
+class Renderer:
+    """Draws a Game's state once per frame. The simulation never depends on
+    which renderer is in use, so views can be swapped at startup."""
+    def __init__(self, game):
+        self.game = game
+
+    def draw(self):
+        raise NotImplementedError
+
+class NullRenderer(Renderer):
+    """Draws nothing, for headless bot and soak runs."""
+    def draw(self):
+        pass
+
+class ScreenRenderer(Renderer):
+    """What every on-screen view shares: the render queue, HUD, minimap and overlays."""
+    def __init__(self, game):
+        super().__init__(game)
+        self.screen = game.screen
+        self.width = game.width
+        self.height = game.height
+        self.queue = RenderQueue(self.screen)
+        self.hud_font = pygame.font.SysFont(None, 36)
+        self.floor_surface = None
+        self.enemy_surface = None
+        self.particle_sprites: List[List[pygame.Surface]] = []  # Fade steps per particle kind
+
+        # Only needed once a floor is cleared, so it is streamed in after the first frame
+        self._staircase_sprite: Optional[pygame.Surface] = None
+        game.defer(self._load_staircase_sprite, FEAT_SHEET)
+
+    def _load_staircase_sprite(self):
+        if self._staircase_sprite is not None:
+            return
+        # Slice the one tile we use straight out of the sheet instead of
+        # cutting the whole sheet into tiles
+        feat_tile_size = 32
+        row = 9  
+        col = 29  
+        feat_spritesheet = assets.get(FEAT_SHEET)
+        rect = pygame.Rect(col * feat_tile_size + 2, row * feat_tile_size + 2, feat_tile_size, feat_tile_size)
+        tile = pygame.Surface((feat_tile_size, feat_tile_size), pygame.SRCALPHA)
+        tile.blit(feat_spritesheet, (0, 0), rect)
+        self._staircase_sprite = pygame.transform.scale(tile, (80, 80))  # Match the size of the current rectangle
+
+    @property
+    def staircase_sprite(self) -> pygame.Surface:
+        self._load_staircase_sprite()
+        return self._staircase_sprite
+
+    def draw(self):
+        game = self.game
+        profiler = game.profiler
+        self.screen.fill((0, 0, 0))
+        
+        current_room = game.dungeon.rooms[game.dungeon.current_room_pos]
+
+        with profiler.section("draw world"):
+            self.draw_world(current_room)
+        with profiler.section("draw ui"):
+            self.draw_ui()
+        with profiler.section("draw flush"):
+            self.queue.flush()
+        
+        # Draw minimap (not affected by camera)
+        with profiler.section("draw minimap"):
+            game.minimap.draw(self.screen, game.ticks % game.quality.settings.minimap_interval == 0)
+
+        # Draw flash message if active
+        if game.flash_message and game.flash_message.is_active():
+            game.flash_message.draw(self.screen)
+
+        profiler.count("rooms", len(game.dungeon.rooms))
+        profiler.count("walls", len(current_room.walls))
+        profiler.count("walls before merge", current_room.unmerged_walls)
+        profiler.count("enemies", len(current_room.enemies))
+        profiler.count("blits", self.queue.submitted)
+        profiler.count("draw calls", self.queue.calls)
+        profiler.count("quality", game.quality.settings.name)
+        profiler.draw_overlay(self.screen)
+        
+        pygame.display.flip()
+
+    def draw_world(self, current_room: Room):
+        raise NotImplementedError
+
+    def draw_bullets(self, to_screen: Callable[[float, float], Tuple[float, float]]):
+        """Queue the enemy bullets that land on screen, all sharing one sprite."""
+        bullets = self.game.bullets
+        radius = bullets.radius
+        sprite = self.queue.primitives.circle((255, 80, 200), radius)
+        xs, ys = bullets.x, bullets.y
+        commands = []
+        for i in range(bullets.count):
+            screen_x, screen_y = to_screen(xs[i], ys[i])
+            if -radius <= screen_x <= self.width + radius and -radius <= screen_y <= self.height + radius:
+                commands.append((sprite, (screen_x - radius, screen_y - radius)))
+        self.queue.blit_many(LAYER_ITEMS, commands)
+
+    def draw_particles(self, to_screen: Callable[[float, float], Tuple[float, float]]):
+        """Queue live particles as blits of pre-faded sprites."""
+        particles = self.game.particles
+        sprites = self.particle_sprites
+        for color, radius in particles.kinds[len(sprites):]:
+            sprites.append([self.queue.primitives.circle((*color, 255 * (FADE_STEPS - step) // FADE_STEPS), radius)
+                            for step in range(FADE_STEPS)])
+        kinds = particles.kinds
+        commands = []
+        for x, y, kind, step in particles.live():
+            radius = kinds[kind][1]
+            screen_x, screen_y = to_screen(x, y)
+            if -radius <= screen_x <= self.width + radius and -radius <= screen_y <= self.height + radius:
+                commands.append((sprites[kind][step], (screen_x - radius, screen_y - radius)))
+        self.queue.blit_many(LAYER_PARTICLES, commands)
+
+    def show_health_bar(self, enemy: Enemy) -> bool:
+        mode = self.game.quality.settings.health_bars
+        return mode == "all" or (mode == "damaged" and enemy.health < enemy.max_health)
+
+    def draw_ui(self):
+        game = self.game
+        queue = self.queue
+        # UI elements (not affected by camera)
+        # Draw player health bar
+        health_width = (game.player.health / 100) * 200
+        queue.rect(LAYER_UI, (0, 255, 0), pygame.Rect(10, 10, health_width, 20))
+
+        if game.hud_dirty:
+            floor_text = f"Floor: {game.dungeon.current_floor}/{game.dungeon.num_floors}"
+            self.floor_surface = self.hud_font.render(floor_text, True, (255, 255, 255))
+            enemy_text = f"Enemies: {game.alive_enemies}/{game.total_enemies}"
+            self.enemy_surface = self.hud_font.render(enemy_text, True, (255, 255, 255))
+            game.hud_dirty = False
+
+        # Draw floor indicator
+        queue.blit(LAYER_UI, self.floor_surface, (self.width - 150, 10))
+        
+        # Draw enemy counter
+        queue.blit(LAYER_UI, self.enemy_surface, (self.width - 150, 50))
+
+        # Draw ability cooldowns
+        y = 40
+        for name, ability in game.player.abilities.items():
+            if ability.is_ready():
+                color = (0, 255, 0)
+            else:
+                color = (255, 0, 0)
+            queue.rect(LAYER_UI, color, pygame.Rect(10, y, 20, 20))
+            y += 30
+
+FOG_ALPHA = 190  # Darkness over what the player cannot see
+FOG_CLEAR = (255, 0, 255)  # Colour key for the parts of the fog that are see-through
+
+class TopDownRenderer(ScreenRenderer):
+    def __init__(self, game):
+        super().__init__(game)
+        # Add camera
+        self.camera = Camera(self.width, self.height)
+        # Fog: one pixel per occupancy cell for the room, and the part in view scaled up
+        self.fog_mask: Optional[pygame.Surface] = None
+        self.fog_rows: Optional[List[int]] = None  # Visibility result the mask was built from
+        self.fog_view: Optional[Tuple[int, int]] = None
+        self.fog_surface: Optional[pygame.Surface] = None
+        self.fog_origin = (0, 0)
+
+    def draw_fog(self, visibility: VisibilityMap):
+        """Darken everything the player cannot see with a single blit.
+
+        The mask only changes when the player enters another cell, and the
+        scaled copy only when the view crosses a cell boundary as well.
+        """
+        occupancy = visibility.occupancy
+        if self.fog_rows is not visibility.visible_rows:
+            mask = pygame.Surface((occupancy.cols, occupancy.rows))
+            for row, bits in enumerate(visibility.visible_rows):
+                # Clear each run of visible cells with one fill
+                while bits:
+                    start = (bits & -bits).bit_length() - 1
+                    run = bits >> start
+                    length = (run ^ (run + 1)).bit_length() - 1
+                    mask.fill(FOG_CLEAR, (start, row, length, 1))
+                    bits &= ~(((1 << length) - 1) << start)
+            self.fog_mask = mask
+            self.fog_rows = visibility.visible_rows
+            self.fog_view = None
+
+        cell_size = occupancy.cell_size
+        view = (int(self.camera.x) // cell_size, int(self.camera.y) // cell_size)
+        if view != self.fog_view:
+            area = pygame.Rect(view, (self.width // cell_size + 2, self.height // cell_size + 2))
+            area = area.clip(self.fog_mask.get_rect())
+            self.fog_surface = pygame.transform.scale(self.fog_mask.subsurface(area),
+                                                      (area.width * cell_size, area.height * cell_size))
+            # Colour key plus surface alpha blits far faster than per-pixel alpha,
+            # and run-length encoding skips the see-through runs outright
+            self.fog_surface.set_colorkey(FOG_CLEAR, pygame.RLEACCEL)
+            self.fog_surface.set_alpha(FOG_ALPHA, pygame.RLEACCEL)
+            self.fog_view = view
+            self.fog_origin = (area.x * cell_size, area.y * cell_size)
+        self.queue.blit(LAYER_FOG, self.fog_surface, self.camera.apply(*self.fog_origin))
+
+    def draw_world(self, current_room: Room):
+        game = self.game
+        queue = self.queue
+        self.camera.update(game.player.x, game.player.y, current_room.width, current_room.height)
+        camera_x = self.camera.x
+        camera_y = self.camera.y
+
+        # Draw floor tiles, only the rows and columns inside the camera view
+        grid = current_room.floor_grid
+        tile_size = current_room.floor_tile_size
+        first_col = max(0, int(camera_x) // tile_size)
+        last_col = min(grid.cols, int(camera_x + self.width) // tile_size + 1)
+        first_row = max(0, int(camera_y) // tile_size)
+        last_row = min(grid.rows, int(camera_y + self.height) // tile_size + 1)
+        tiles = current_room.floor_tiles
+        for row in range(first_row, last_row):
+            screen_y = row * tile_size - camera_y
+            if grid.uniform is not None:
+                tile = tiles[grid.uniform]
+                queue.blit_many(LAYER_FLOOR, [(tile, (col * tile_size - camera_x, screen_y))
+                                              for col in range(first_col, last_col)])
+            else:
+                cells = grid.row(row)
+                queue.blit_many(LAYER_FLOOR, [(tiles[cells[col]], (col * tile_size - camera_x, screen_y))
+                                              for col in range(first_col, last_col)])
+
+        # Draw walls with camera offset, looking up only the ones near the view
+        view = pygame.Rect(camera_x, camera_y, self.width, self.height)
+        for wall in current_room.wall_index.nearby(view):
+            queue.rect(LAYER_WALLS, (128, 128, 128), wall.move(-camera_x, -camera_y))
+        
+        # Draw ability effects
+        for ability_name, ability in game.player.abilities.items():
+            if ability.should_show_effect():
+                if ability_name == "aoe":
+                    current_frame = ability.get_current_frame()
+                    if current_frame:
+                        player_screen_pos = self.camera.apply(game.player.x, game.player.y)
+                        # The big alpha blit is the expensive part; lower quality keeps only the outline
+                        if game.quality.settings.effect_sprites:
+                            frame_rect = current_frame.get_rect(center=player_screen_pos)
+                            queue.blit(LAYER_EFFECTS, current_frame, frame_rect)
+                        queue.draw(LAYER_EFFECTS, lambda screen, center=player_screen_pos, radius=ability.range:
+                                   pygame.draw.circle(screen, (255, 255, 0, 64),
+                                                      (int(center[0]), int(center[1])), radius, 2))
+                            
+                elif ability_name == "cone":
+                    # Draw cone AOE with camera offset
+                    points = []
+                    cone_angle = pi / 2  # 90 degrees
+                    start_angle = game.player.direction - cone_angle / 2
+                    end_angle = game.player.direction + cone_angle / 2
+                    
+                    # Get player screen position
+                    player_screen_pos = self.camera.apply(game.player.x, game.player.y)
+                    points.append(player_screen_pos)
+                    
+                    # Add points along the arc
+                    for i in range(21):
+                        angle = start_angle + (i / 20) * cone_angle
+                        world_x = game.player.x + cos(angle) * ability.range
+                        world_y = game.player.y + sin(angle) * ability.range
+                        screen_x, screen_y = self.camera.apply(world_x, world_y)
+                        points.append((screen_x, screen_y))
+                    
+                    # Close the shape
+                    points.append(player_screen_pos)
+                    
+                    # Draw cone
+                    queue.draw(LAYER_EFFECTS, lambda screen, points=points:
+                               pygame.draw.polygon(screen, (255, 165, 0, 128), points, 2))
+        
+        # Draw projectiles with camera offset
+        for projectile in game.player.projectiles:
+            queue.circle(LAYER_ITEMS, (255, 255, 0), self.camera.apply(projectile.x, projectile.y), 5)
+        self.draw_bullets(self.camera.apply)
+        self.draw_particles(self.camera.apply)
+            
+        # Draw enemies with camera offset, leaving out those hidden in the fog
+        visibility = game.visibility
+        if visibility is not None:
+            self.draw_fog(visibility)
+        for enemy in current_room.enemies:
+            enemy_screen_x, enemy_screen_y = self.camera.apply(enemy.x, enemy.y)
+            if not (-enemy.size <= enemy_screen_x <= self.width + enemy.size and
+                    -enemy.size <= enemy_screen_y <= self.height + enemy.size):
+                continue
+            if visibility is not None and not visibility.sees(enemy.x, enemy.y):
+                continue
+            if enemy.is_boss:
+                color = (255, 0, 0) if enemy.health > enemy.max_health / 2 else (200, 0, 0)
+                queue.rect(LAYER_ENTITIES, color,
+                           pygame.Rect(enemy_screen_x - enemy.size/2,
+                                       enemy_screen_y - enemy.size/2,
+                                       enemy.size, enemy.size))
+            else:
+                current_frame = enemy.get_current_frame()
+                frame_rect = current_frame.get_rect(center=(enemy_screen_x, enemy_screen_y))
+                queue.blit(LAYER_ENTITIES, current_frame, frame_rect)
+
+            # Draw enemy health bar
+            if self.show_health_bar(enemy):
+                health_width = (enemy.health / enemy.max_health) * enemy.size
+                queue.rect(LAYER_BARS, (0, 255, 0),
+                           pygame.Rect(enemy_screen_x - enemy.size/2,
+                                       enemy_screen_y - enemy.size/2 - 10,
+                                       health_width, 5))
+
+        # Draw power-ups
+        for power_up in current_room.power_ups:
+            queue.circle(LAYER_ITEMS, power_up.color, self.camera.apply(power_up.x, power_up.y),
+                         int(power_up.get_display_size()))
+
+        # Draw staircase if floor is complete
+        if game.dungeon.floor_completed and game.dungeon.current_room_pos == game.dungeon.boss_pos:
+            stair_x, stair_y = self.camera.apply(current_room.width // 2, current_room.height // 2)
+            # Draw staircase sprite
+            stair_rect = self.staircase_sprite.get_rect(center=(stair_x, stair_y))
+            queue.blit(LAYER_ITEMS, self.staircase_sprite, stair_rect)
+
+        # Draw player with camera offset
+        player_screen_x, player_screen_y = self.camera.apply(game.player.x, game.player.y)
+
+        # Get current frame
+        current_frame = game.player.get_current_frame()
+        frame_rect = current_frame.get_rect(center=(player_screen_x, player_screen_y))
+        queue.blit(LAYER_PLAYER, current_frame, frame_rect)
+
+        # Direction indicator is still useful for abilities
+        end_world_x = game.player.x + cos(game.player.direction) * 20
+        end_world_y = game.player.y + sin(game.player.direction) * 20
+        end_screen_x, end_screen_y = self.camera.apply(end_world_x, end_world_y)
+                
+        queue.draw(LAYER_BARS, lambda screen: pygame.draw.line(screen, (0, 255, 0),
+                                                               (player_screen_x, player_screen_y),
+                                                               (end_screen_x, end_screen_y), 2))
+
+class IsometricRenderer(ScreenRenderer):
+    """Isometric view of the same simulation, centred on the player.
+
+    The projected floor and walls of the current room are baked lazily into
+    fixed-size chunks, so only the parts of a big room that come into view
+    are ever drawn, and each of those only once.
+    """
+    chunk_size = 512
+    max_chunks = 24  # About 24MB of baked background at 32 bits per pixel
+    tile_step = 64
+    tile_width = 64
+    tile_height = 32
+
+    def __init__(self, game):
+        super().__init__(game)
+        self.chunk_room: Optional[Room] = None
+        self.chunks: "OrderedDict[Tuple[int, int], pygame.Surface]" = OrderedDict()  # Oldest first
+        self.diamonds: Dict[Tuple[Tuple[int, int, int], int], pygame.Surface] = {}
+        # Player and enemies of the current room, kept sorted by depth between frames
+        self.depth_order: List = []
+        self.depth_room: Optional[Room] = None
+        self.queue.keep_order(LAYER_ENTITIES)
+
+    def _chunk(self, room: Room, key: Tuple[int, int]) -> pygame.Surface:
+        if self.chunk_room is not room:
+            self.chunks.clear()
+            self.chunk_room = room
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+
+        size = self.chunk_size
+        origin_x = key[0] * size
+        origin_y = key[1] * size
+        chunk = pygame.Surface((size, size)).convert()
+        chunk.fill((0, 0, 0))
+
+        # Cartesian bounds of this chunk, padded by half a tile on each side
+        corners = [iso_to_cart(origin_x + dx, origin_y + dy) for dx in (0, size) for dy in (0, size)]
+        margin = self.tile_width
+        min_x = min(x for x, _ in corners) - margin
+        max_x = max(x for x, _ in corners) + margin
+        min_y = min(y for _, y in corners) - margin
+        max_y = max(y for _, y in corners) + margin
+
+        # Draw floor (grid of tiles)
+        step = self.tile_step
+        half_w = self.tile_width // 2
+        half_h = self.tile_height // 2
+        for y in range(max(0, int(min_y) // step * step), min(room.height, int(max_y)), step):
+            for x in range(max(0, int(min_x) // step * step), min(room.width, int(max_x)), step):
+                iso_x, iso_y = cart_to_iso(x, y)
+                iso_x -= origin_x
+                iso_y -= origin_y
+                
+                # Draw isometric tile (simple diamond shape)
+                points = [
+                    (iso_x, iso_y - half_h),
+                    (iso_x + half_w, iso_y),
+                    (iso_x, iso_y + half_h),
+                    (iso_x - half_w, iso_y)
+                ]
+                pygame.draw.polygon(chunk, (50, 50, 50), points)
+                pygame.draw.polygon(chunk, (100, 100, 100), points, 1)
+
+        # Draw walls
+        bounds = pygame.Rect(min_x, min_y, max_x - min_x, max_y - min_y)
+        for wall in room.wall_index.nearby(bounds):
+            corners = [
+                cart_to_iso(wall.x, wall.y),
+                cart_to_iso(wall.x + wall.width, wall.y),
+                cart_to_iso(wall.x + wall.width, wall.y + wall.height),
+                cart_to_iso(wall.x, wall.y + wall.height)
+            ]
+            adjusted_corners = [(x - origin_x, y - origin_y) for x, y in corners]
+            pygame.draw.polygon(chunk, (128, 128, 128), adjusted_corners)
+            pygame.draw.polygon(chunk, (200, 200, 200), adjusted_corners, 1)
+
+        self.chunks[key] = chunk
+        if len(self.chunks) > self.max_chunks:
+            self.chunks.popitem(last=False)
+        return chunk
+
+    def _diamond(self, color: Tuple[int, int, int], size: int) -> pygame.Surface:
+        key = (color, size)
+        sprite = self.diamonds.get(key)
+        if sprite is None:
+            half = size // 2
+            sprite = pygame.Surface((half * 2 + 1, half * 2 + 1), pygame.SRCALPHA)
+            points = [(half, 0), (half * 2, half), (half, half * 2), (0, half)]
+            pygame.draw.polygon(sprite, color, points)
+            pygame.draw.polygon(sprite, (255, 255, 255), points, 1)
+            self.diamonds[key] = sprite
+        return sprite
+
+    def _sort_by_depth(self, entities: list):
+        """Insertion sort on x + y (twice the iso y), in place. Entities only move
+        a few pixels per frame, so last frame's order is almost sorted."""
+        for i in range(1, len(entities)):
+            entity = entities[i]
+            depth = entity.x + entity.y
+            j = i - 1
+            while j >= 0 and entities[j].x + entities[j].y > depth:
+                entities[j + 1] = entities[j]
+                j -= 1
+            entities[j + 1] = entity
+
+    def _update_depth_order(self, room: Room):
+        # Membership is re-read every frame, since deaths, enemies migrating in
+        # and loading a save all change room.enemies. Entities still present
+        # keep last frame's order, so the sort stays close to linear
+        entities = room.enemies + [self.game.player]
+        present = set(entities)
+        order = [entity for entity in self.depth_order if entity in present] if self.depth_room is room else []
+        if len(order) != len(entities):
+            known = set(order)
+            order.extend(entity for entity in entities if entity not in known)
+        self.depth_order = order
+        self.depth_room = room
+        self._sort_by_depth(order)
+
+    def draw_world(self, current_room: Room):
+        game = self.game
+        queue = self.queue
+        player = game.player
+
+        # Calculate room offset to center the view on the player
+        player_iso_x, player_iso_y = cart_to_iso(player.x, player.y)
+        offset_x = self.width // 2 - int(player_iso_x)
+        offset_y = self.height // 2 - int(player_iso_y)
+
+        # Floor and static walls come from the baked background chunks in view
+        size = self.chunk_size
+        for chunk_y in range((-offset_y) // size, (self.height - offset_y) // size + 1):
+            for chunk_x in range((-offset_x) // size, (self.width - offset_x) // size + 1):
+                chunk = self._chunk(current_room, (chunk_x, chunk_y))
+                queue.blit(LAYER_FLOOR, chunk, (chunk_x * size + offset_x, chunk_y * size + offset_y))
+        
+        # Draw ability effects in isometric space
+        aoe = player.abilities["aoe"]
+        if aoe.should_show_effect():
+            # Draw circle AOE as an ellipse in isometric view
+            iso_x, iso_y = player_iso_x + offset_x, player_iso_y + offset_y
+            queue.draw(LAYER_EFFECTS, lambda screen: pygame.draw.ellipse(
+                screen, (255, 255, 0, 128),
+                (iso_x - aoe.range, iso_y - aoe.range // 2, aoe.range * 2, aoe.range), 2))
+        
+        # Draw projectiles
+        for projectile in player.projectiles:
+            iso_x, iso_y = cart_to_iso(projectile.x, projectile.y)
+            queue.circle(LAYER_ITEMS, (255, 255, 0), (iso_x + offset_x, iso_y + offset_y), 5)
+        to_screen = lambda x, y: (x - y + offset_x, (x + y) / 2 + offset_y)  # cart_to_iso, inlined
+        self.draw_bullets(to_screen)
+        self.draw_particles(to_screen)
+
+        # Draw power-ups
+        for power_up in current_room.power_ups:
+            iso_x, iso_y = cart_to_iso(power_up.x, power_up.y)
+            queue.circle(LAYER_ITEMS, power_up.color, (iso_x + offset_x, iso_y + offset_y),
+                         int(power_up.get_display_size()))
+
+        # Draw staircase if floor is complete
+        if game.dungeon.floor_completed and game.dungeon.current_room_pos == game.dungeon.boss_pos:
+            iso_x, iso_y = cart_to_iso(current_room.width // 2, current_room.height // 2)
+            stair_rect = self.staircase_sprite.get_rect(center=(iso_x + offset_x, iso_y + offset_y))
+            queue.blit(LAYER_ITEMS, self.staircase_sprite, stair_rect)
+        
+        # Entities go through a layer that keeps submission order, so they are
+        # still batched into one blits() call without losing depth order
+        self._update_depth_order(current_room)
+        for entity in self.depth_order:
+            iso_x, iso_y = cart_to_iso(entity.x, entity.y)
+            iso_x += offset_x
+            iso_y += offset_y
+            if not (-entity.size <= iso_x <= self.width + entity.size and
+                    -entity.size <= iso_y <= self.height + entity.size):
+                continue
+            
+            if entity is player:
+                # Draw player as diamond shape
+                sprite = self._diamond((0, 255, 0), player.size)
+                queue.blit(LAYER_ENTITIES, sprite, sprite.get_rect(center=(iso_x, iso_y)))
+            else:
+                color = (255, 0, 0) if entity.health > entity.max_health / 2 else (200, 0, 0)
+                # Draw enemy as diamond shape
+                sprite = self._diamond(color, entity.size)
+                queue.blit(LAYER_ENTITIES, sprite, sprite.get_rect(center=(iso_x, iso_y)))
+                
+                # Draw enemy health bar above in isometric space
+                if self.show_health_bar(entity):
+                    health_width = (entity.health / entity.max_health) * entity.size
+                    queue.rect(LAYER_BARS, (0, 255, 0),
+                               pygame.Rect(iso_x - health_width // 2, iso_y - entity.size, health_width, 5))
+
+        # Draw player direction indicator
+        center = (player_iso_x + offset_x, player_iso_y + offset_y)
+        end = (center[0] + cos(player.direction) * 20,
+               center[1] + sin(player.direction) * 10)  # Half Y scale for isometric
+        queue.draw(LAYER_BARS, lambda screen: pygame.draw.line(screen, (0, 255, 0), center, end, 2))
+
+RENDERERS = {
+    "topdown": TopDownRenderer,
+    "isometric": IsometricRenderer,
+    "null": NullRenderer,
+}
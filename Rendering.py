@@ -0,0 +1,105 @@
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import pygame
+
+# Draw layers, back to front
+LAYER_FLOOR = 0
+LAYER_WALLS = 1
+LAYER_EFFECTS = 2
+LAYER_ITEMS = 3
+LAYER_ENTITIES = 4
+LAYER_PLAYER = 5
+LAYER_PARTICLES = 6
+LAYER_FOG = 7
+LAYER_BARS = 8
+LAYER_UI = 9
+
+Color = Tuple[int, int, int]
+
+class PrimitiveCache:
+    """Pre-baked sprites for solid rects and circles so they can go through blits().
+
+    Each colour gets one screen-sized solid surface; a rect is that surface
+    blitted with an area, clipped to the screen first.
+    """
+    def __init__(self, screen_size: Tuple[int, int]):
+        self.bounds = pygame.Rect((0, 0), screen_size)
+        self.solids: Dict[Color, pygame.Surface] = {}
+        self.circles: Dict[Tuple[Color, int], pygame.Surface] = {}
+
+    def solid(self, color: Color) -> pygame.Surface:
+        surface = self.solids.get(color)
+        if surface is None:
+            surface = pygame.Surface(self.bounds.size)
+            surface.fill(color)
+            self.solids[color] = surface
+        return surface
+
+    def circle(self, color: Color, radius: int) -> pygame.Surface:
+        key = (color, radius)
+        surface = self.circles.get(key)
+        if surface is None:
+            surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(surface, color, (radius, radius), radius)
+            self.circles[key] = surface
+        return surface
+
+class RenderQueue:
+    """Collects draw commands per layer during a frame and flushes each layer
+    with a single Surface.blits call, sorted by texture.
+
+    Shapes that cannot be baked (outlines, polygons, lines) are queued as
+    callables and run after the blits of their layer.
+    """
+    def __init__(self, screen: pygame.Surface):
+        self.screen = screen
+        self.primitives = PrimitiveCache(screen.get_size())
+        self.layers: Dict[int, List[tuple]] = {}
+        self.custom: Dict[int, List[Callable[[pygame.Surface], None]]] = {}
+        self.ordered: Set[int] = set()  # Layers flushed in submission order, e.g. depth-sorted
+        self.submitted = 0  # Commands in the last flush
+        self.calls = 0      # blits() and custom draw calls in the last flush
+
+    def blit(self, layer: int, surface: pygame.Surface, dest, area: Optional[pygame.Rect] = None):
+        commands = self.layers.setdefault(layer, [])
+        if area is None:
+            commands.append((surface, dest))
+        else:
+            commands.append((surface, dest, area))
+
+    def blit_many(self, layer: int, commands):
+        self.layers.setdefault(layer, []).extend(commands)
+
+    def rect(self, layer: int, color: Color, rect: pygame.Rect):
+        clipped = rect.clip(self.primitives.bounds)
+        if clipped.width and clipped.height:
+            self.blit(layer, self.primitives.solid(color), clipped.topleft,
+                      pygame.Rect(0, 0, clipped.width, clipped.height))
+
+    def circle(self, layer: int, color: Color, center: Tuple[float, float], radius: int):
+        if radius > 0:
+            self.blit(layer, self.primitives.circle(color, radius), (center[0] - radius, center[1] - radius))
+
+    def keep_order(self, layer: int):
+        self.ordered.add(layer)
+
+    def draw(self, layer: int, func: Callable[[pygame.Surface], None]):
+        self.custom.setdefault(layer, []).append(func)
+
+    def flush(self):
+        self.submitted = 0
+        self.calls = 0
+        for layer in sorted(self.layers.keys() | self.custom.keys()):
+            commands = self.layers.get(layer)
+            if commands:
+                if layer not in self.ordered:
+                    # Stable sort, so same-texture commands keep their submission order
+                    commands.sort(key=lambda command: id(command[0]))
+                self.screen.blits(commands, doreturn=False)
+                self.submitted += len(commands)
+                self.calls += 1
+            for func in self.custom.get(layer, ()):
+                func(self.screen)
+                self.calls += 1
+        self.layers = {}
+        self.custom = {}
@@ -0,0 +1,78 @@
+from collections import OrderedDict, deque
+from typing import Deque
+
+from Dungeon import *
+
+
+class RoomResourceManager:
+    """Keeps render data resident only for rooms near the player.
+
+    The current room and the rooms behind its doors are pinned. Only the
+    current room is loaded right away; its neighbours are queued and loaded
+    one per stream() call so a room change never waits on them. Other rooms
+    stay loaded in least-recently-used order until the byte budget is
+    exceeded, then they are released; Room rebuilds them from its seed when
+    they are pinned again.
+    """
+    def __init__(self, dungeon: DungeonMap, budget_bytes: int = 32 * 1024 * 1024):
+        self.dungeon = dungeon
+        self.budget_bytes = budget_bytes
+        self.resident: "OrderedDict[Tuple[int, int], int]" = OrderedDict()  # pos -> bytes, oldest first
+        self.pinned: Set[Tuple[int, int]] = set()
+        self.pending: Deque[Tuple[int, int]] = deque()  # Pinned rooms still to load
+        self.evictions = 0
+
+    def update(self, current_pos: Tuple[int, int]):
+        """Call whenever the player changes rooms."""
+        self.pinned = {current_pos}
+        self.pinned.update(self.dungeon.neighbours(current_pos).values())
+
+        self.pending = deque(pos for pos in self.dungeon.neighbours(current_pos).values()
+                             if pos not in self.resident)
+        for pos in self.pinned:
+            if pos in self.resident:
+                self.resident.move_to_end(pos)
+        # The current room ends up most recently used
+        self._load(current_pos)
+        self._trim()
+
+    def stream(self) -> bool:
+        """Load the next queued neighbour. False once nothing is left to load."""
+        while self.pending:
+            pos = self.pending.popleft()
+            if pos in self.pinned and pos not in self.resident:
+                self._load(pos)
+                self._trim()
+                return True
+        return False
+
+    def _load(self, pos: Tuple[int, int]):
+        room = self.dungeon.rooms[pos]
+        room.load_render_data()
+        self.resident[pos] = room.render_data_bytes()
+        self.resident.move_to_end(pos)
+
+    def _trim(self):
+        for pos in list(self.resident):
+            if self.resident_bytes() <= self.budget_bytes:
+                break
+            if pos not in self.pinned:
+                self.dungeon.rooms[pos].release_render_data()
+                del self.resident[pos]
+                self.evictions += 1
+
+    def resident_bytes(self) -> int:
+        return sum(self.resident.values())
+
+    def report(self) -> Dict[Tuple[int, int], int]:
+        """Current byte estimate for every room on the floor (0 when evicted)."""
+        return {pos: room.render_data_bytes() for pos, room in self.dungeon.rooms.items()}
+
+    def format_report(self) -> str:
+        lines = []
+        for pos, size in sorted(self.report().items()):
+            state = "pinned" if pos in self.pinned else ("resident" if pos in self.resident else "evicted")
+            lines.append(f"room {pos}: {size / 1024:.0f}KB {state}")
+        lines.append(f"floor total: {self.resident_bytes() / 1024:.0f}KB of "
+                     f"{self.budget_bytes / 1024:.0f}KB budget, {self.evictions} evictions")
+        return "\n".join(lines)
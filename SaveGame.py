@@ -0,0 +1,166 @@
+import os
+import struct
+
+from Dungeon import *
+
+# Binary snapshot layout (little-endian):
+#   header, player, abilities, projectiles, then one record per room.
+# Rooms are rebuilt from the floor seed, so only what changed since generation
+# is stored: flags, the surviving enemies (by home room and spawn index,
+# since enemies can wander into other rooms) and power-ups.
+# Timestamps are stored as remaining cooldowns since time() is wall-clock.
+SNAPSHOT_MAGIC = b"DGSV"
+SNAPSHOT_VERSION = 2
+
+HEADER = struct.Struct("<4sHIHHHhh?")   # magic, version, seed, size, floor, num_floors, room x, room y, floor completed
+PLAYER = struct.Struct("<ffihf?")       # x, y, health, speed, direction, multi shot
+ABILITY = struct.Struct("<iff")         # damage, cooldown, remaining cooldown
+PROJECTILE = struct.Struct("<fffhiif")  # x, y, direction, speed, damage, range, distance traveled
+ROOM = struct.Struct("<hhBHH")          # x, y, flags, enemy count, power-up count
+ENEMY = struct.Struct("<hhHffif")       # home room x, home room y, spawn id, x, y, health, remaining attack cooldown
+ENEMY_V1 = struct.Struct("<Hffif")      # Version 1 had no home room: enemies never left theirs
+POWER_UP = struct.Struct("<Bff")        # type, x, y
+COUNT = struct.Struct("<H")
+
+ABILITY_ORDER = ["aoe", "cone", "projectile"]
+POWER_UP_TYPES = list(PowerUpType)
+
+ROOM_EXPLORED = 1
+ROOM_BOSS_DEFEATED = 2
+
+QUICKSAVE_PATH = os.path.join("saves", "quicksave.sav")
+
+def _remaining(last_used: float, cooldown: float, now: float) -> float:
+    return max(0.0, cooldown - (now - last_used))
+
+def save_snapshot(game) -> bytes:
+    """Pack the game state into bytes. Never touches surfaces or image files."""
+    now = time()
+    dungeon = game.dungeon
+    player = game.player
+    parts = [
+        HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, dungeon.seed, dungeon.size,
+                    dungeon.current_floor, dungeon.num_floors,
+                    dungeon.current_room_pos[0], dungeon.current_room_pos[1],
+                    dungeon.floor_completed),
+        PLAYER.pack(player.x, player.y, player.health, player.speed,
+                    player.direction, player.has_multi_shot)
+    ]
+
+    for name in ABILITY_ORDER:
+        ability = player.abilities[name]
+        parts.append(ABILITY.pack(ability.damage, ability.cooldown,
+                                  _remaining(ability.last_used, ability.cooldown, now)))
+
+    parts.append(COUNT.pack(len(player.projectiles)))
+    for projectile in player.projectiles:
+        parts.append(PROJECTILE.pack(projectile.x, projectile.y, projectile.direction,
+                                     projectile.speed, projectile.damage, projectile.range,
+                                     projectile.distance_traveled))
+
+    parts.append(COUNT.pack(len(dungeon.rooms)))
+    for pos, room in dungeon.rooms.items():
+        flags = 0
+        if room.explored:
+            flags |= ROOM_EXPLORED
+        if room.boss_defeated:
+            flags |= ROOM_BOSS_DEFEATED
+        parts.append(ROOM.pack(pos[0], pos[1], flags, len(room.enemies), len(room.power_ups)))
+        for enemy in room.enemies:
+            parts.append(ENEMY.pack(enemy.home_pos[0], enemy.home_pos[1], enemy.spawn_id,
+                                    enemy.x, enemy.y, enemy.health,
+                                    _remaining(enemy.last_attack, enemy.attack_cooldown, now)))
+        for power_up in room.power_ups:
+            parts.append(POWER_UP.pack(POWER_UP_TYPES.index(power_up.type), power_up.x, power_up.y))
+
+    return b"".join(parts)
+
+def load_snapshot(game, data: bytes):
+    """Restore a snapshot into a running game.
+
+    The existing Player keeps its sprites. The floor is only regenerated when
+    the snapshot comes from a different seed than the one being played.
+    """
+    now = time()
+    offset = 0
+
+    def read(layout: struct.Struct):
+        nonlocal offset
+        values = layout.unpack_from(data, offset)
+        offset += layout.size
+        return values
+
+    magic, version, seed, size, floor, num_floors, room_x, room_y, floor_completed = read(HEADER)
+    if magic != SNAPSHOT_MAGIC or version not in (1, SNAPSHOT_VERSION):
+        raise ValueError(f"Unsupported save data (magic {magic!r}, version {version})")
+
+    if game.dungeon.seed != seed or game.dungeon.size != size:
+        game.dungeon = DungeonMap(size=size, num_floors=num_floors, seed=seed,
+                                  room_config=game.config.room, cache=game.floor_cache)
+        game.minimap = Minimap(game.dungeon)
+    dungeon = game.dungeon
+    dungeon.current_floor = floor
+    dungeon.num_floors = num_floors
+    dungeon.current_room_pos = (room_x, room_y)
+    dungeon.floor_completed = floor_completed
+
+    player = game.player
+    player.x, player.y, player.health, player.speed, player.direction, player.has_multi_shot = read(PLAYER)
+    for name in ABILITY_ORDER:
+        ability = player.abilities[name]
+        ability.damage, ability.cooldown, remaining = read(ABILITY)
+        ability.last_used = now - (ability.cooldown - remaining)
+
+    player.projectiles = []
+    player.active_effects = []
+    for _ in range(read(COUNT)[0]):
+        x, y, direction, speed, damage, max_range, distance_traveled = read(PROJECTILE)
+        projectile = Projectile(x, y, direction, speed, damage, max_range)
+        projectile.distance_traveled = distance_traveled
+        player.projectiles.append(projectile)
+
+    for _ in range(read(COUNT)[0]):
+        x, y, flags, enemy_count, power_up_count = read(ROOM)
+        room = dungeon.rooms[(x, y)]
+        room.explored = bool(flags & ROOM_EXPLORED)
+        room.boss_defeated = bool(flags & ROOM_BOSS_DEFEATED)
+
+        room.enemies = []
+        for _ in range(enemy_count):
+            if version == 1:
+                home_x, home_y = x, y
+                spawn_id, enemy_x, enemy_y, health, remaining = read(ENEMY_V1)
+            else:
+                home_x, home_y, spawn_id, enemy_x, enemy_y, health, remaining = read(ENEMY)
+            enemy = dungeon.rooms[(home_x, home_y)].spawned_enemies[spawn_id]
+            enemy.x, enemy.y, enemy.health = enemy_x, enemy_y, health
+            enemy.room_pos = (x, y)
+            enemy.heading_out = None
+            enemy.roam_target = None
+            enemy.last_attack = now - (enemy.attack_cooldown - remaining)
+            room.enemies.append(enemy)
+
+        room.clear_power_ups()
+        for _ in range(power_up_count):
+            type_index, power_up_x, power_up_y = read(POWER_UP)
+            room.add_power_up(PowerUp(power_up_x, power_up_y, POWER_UP_TYPES[type_index]))
+
+    # The staircase may have opened since this snapshot was taken
+    for room in dungeon.rooms.values():
+        room.close_staircase()
+    if dungeon.floor_completed and dungeon.boss_pos is not None:
+        dungeon.rooms[dungeon.boss_pos].open_staircase()
+
+def write_snapshot(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Write then rename so a crash mid-save never leaves a truncated file
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+def read_snapshot(path: str) -> Optional[bytes]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return f.read()
@@ -0,0 +1,171 @@
+from collections import deque
+from time import perf_counter
+
+from Dungeon import *
+
+OPPOSITE = {
+    Direction.NORTH: Direction.SOUTH,
+    Direction.SOUTH: Direction.NORTH,
+    Direction.EAST: Direction.WEST,
+    Direction.WEST: Direction.EAST,
+}
+
+class BackgroundSimulation:
+    """Keeps the rooms the player is not in alive at a level of detail that
+    drops with graph distance from the player's room.
+
+    Adjacent rooms are stepped at a reduced rate: enemies wander and now and
+    then walk to the door towards the player and come through it. Rooms
+    further away use an abstract model where only enemy counts and timers
+    matter: enemies drift one room closer to the player without moving
+    inside the room. Each room remembers when it was last stepped and makes
+    up the elapsed time, so skipping frames only lowers detail, never speed.
+    All of it stops once the per-frame budget is spent.
+    """
+    near_step = 1 / 15   # Seconds between steps of an adjacent room
+    far_step = 2.0       # Seconds between steps of a distant room
+    regroup_rate = 0.02  # Chance per second that an idle enemy heads for the player
+    room_capacity = 2    # Rooms stop accepting enemies at this many times their max spawn count
+
+    def __init__(self, dungeon: DungeonMap, budget: float = 0.001, seed: Optional[int] = None):
+        self.dungeon = dungeon
+        self.budget = budget  # Seconds per frame
+        self.rng = random.Random(seed)
+        self.time = 0.0
+        self.last_step: Dict[Tuple[int, int], float] = {pos: 0.0 for pos in dungeon.rooms}
+        self.distance: Dict[Tuple[int, int], int] = {}
+        self.toward_player: Dict[Tuple[int, int], Direction] = {}  # First door on the way to the player
+        self.near: List[Tuple[int, int]] = []
+        self.far: Deque[Tuple[int, int]] = deque()
+        self.steps = 0        # Room steps taken in the last update
+        self.migrations = 0   # Enemies that changed rooms, all time
+        self.focus(dungeon.current_room_pos)
+
+    def focus(self, current_pos: Tuple[int, int]):
+        """Recompute distances from the player's room. Call on every room change."""
+        self.distance = {current_pos: 0}
+        self.toward_player = {}
+        queue = deque([current_pos])
+        while queue:
+            pos = queue.popleft()
+            for direction, next_pos in self.dungeon.neighbours(pos).items():
+                if next_pos not in self.distance:
+                    self.distance[next_pos] = self.distance[pos] + 1
+                    self.toward_player[next_pos] = OPPOSITE[direction]
+                    queue.append(next_pos)
+
+        self.near = [pos for pos, distance in self.distance.items() if distance == 1]
+        self.far = deque(pos for pos, distance in self.distance.items() if distance > 1)
+        # The current room is simulated in full by Game; don't make it up later
+        self.last_step[current_pos] = self.time
+
+    def update(self, dt: float):
+        self.time += dt
+        self.last_step[self.dungeon.current_room_pos] = self.time
+        start = perf_counter()
+        self.steps = 0
+
+        for pos in self.near:
+            if perf_counter() - start >= self.budget:
+                return
+            if self.time - self.last_step[pos] >= self.near_step:
+                self._step_near(pos, self.time - self.last_step[pos])
+                self.last_step[pos] = self.time
+                self.steps += 1
+
+        # Round-robin over distant rooms, picking up where the last frame stopped
+        for _ in range(len(self.far)):
+            if perf_counter() - start >= self.budget:
+                return
+            pos = self.far[0]
+            self.far.rotate(-1)
+            if self.time - self.last_step[pos] >= self.far_step:
+                self._step_far(pos, self.time - self.last_step[pos])
+                self.last_step[pos] = self.time
+                self.steps += 1
+
+    def _step_near(self, pos: Tuple[int, int], elapsed: float):
+        room = self.dungeon.rooms[pos]
+        exit_direction = self.toward_player[pos]
+        door_x, door_y = self._door_point(room, exit_direction, 10)
+        frames = elapsed * 60  # Enemy speeds are in pixels per 60Hz frame
+
+        for enemy in room.enemies[:]:
+            if enemy.health <= 0 or enemy.is_boss:
+                continue
+            if enemy.heading_out is None and self.rng.random() < self.regroup_rate * elapsed:
+                enemy.heading_out = exit_direction
+                enemy.roam_target = None
+
+            if enemy.heading_out is not None:
+                target = (door_x, door_y)
+            else:
+                if enemy.roam_target is None or self.rng.random() < 0.1:
+                    enemy.roam_target = room.occupancy.random_free_position(enemy.size, self.rng, margin=50)
+                target = enemy.roam_target
+            if target is None:
+                continue
+
+            if self._walk(enemy, room, target, enemy.speed * frames) and enemy.heading_out is not None:
+                self._migrate(enemy, pos, exit_direction)
+
+    def _step_far(self, pos: Tuple[int, int], elapsed: float):
+        room = self.dungeon.rooms[pos]
+        if not room.enemies:
+            return
+        exit_direction = self.toward_player[pos]
+        chance = min(1.0, self.regroup_rate * elapsed)
+        for enemy in room.enemies[:]:
+            if enemy.health > 0 and not enemy.is_boss and self.rng.random() < chance:
+                self._migrate(enemy, pos, exit_direction)
+
+    def _walk(self, enemy: Enemy, room: Room, target: Tuple[float, float], step: float) -> bool:
+        """Move up to step pixels towards target, sliding along walls. True on arrival."""
+        dx = target[0] - enemy.x
+        dy = target[1] - enemy.y
+        distance = sqrt(dx * dx + dy * dy)
+        if distance <= step:
+            enemy.x, enemy.y = target
+            return True
+
+        dx = dx / distance * step
+        dy = dy / distance * step
+        half = enemy.size / 2
+        for move_x, move_y in ((dx, dy), (dx, 0), (0, dy)):
+            rect = pygame.Rect(enemy.x + move_x - half, enemy.y + move_y - half, enemy.size, enemy.size)
+            if not room.wall_index.collides(rect):
+                enemy.x += move_x
+                enemy.y += move_y
+                enemy.set_animation_based_on_movement(move_x, move_y)
+                return False
+        # Stuck against a wall: pick somewhere else next step
+        enemy.roam_target = None
+        return False
+
+    def _migrate(self, enemy: Enemy, from_pos: Tuple[int, int], direction: Direction):
+        to_pos = self.dungeon.neighbour(from_pos, direction)
+        target = self.dungeon.rooms[to_pos]
+        if len(target.enemies) >= self.room_capacity * target.config.max_enemies:
+            enemy.heading_out = None
+            return
+
+        # Come in through the matching door, far enough in to not block it
+        entry_x, entry_y = self._door_point(target, OPPOSITE[direction], 60)
+        position = target.occupancy.nearest_free_position(entry_x, entry_y, enemy.size)
+        if position is None:
+            enemy.heading_out = None
+            return
+
+        self.dungeon.rooms[from_pos].enemies.remove(enemy)
+        enemy.x, enemy.y = position
+        enemy.room_pos = to_pos
+        enemy.heading_out = None
+        enemy.roam_target = None
+        # It came looking for the player; anywhere else it settles down
+        enemy.awake = to_pos == self.dungeon.current_room_pos
+        target.enemies.append(enemy)
+        self.migrations += 1
+
+    def _door_point(self, room: Room, direction: Direction, inset: int) -> Tuple[float, float]:
+        return (room.width // 2 + direction.value[0] * (room.width // 2 - inset),
+                room.height // 2 + direction.value[1] * (room.height // 2 - inset))
@@ -0,0 +1,526 @@
+import pygame
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from math import ceil
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+def _decompose(rects: List[pygame.Rect], transpose: bool) -> List[pygame.Rect]:
+    # Work in (across, along) coordinates so one routine does rows and columns
+    if transpose:
+        spans = [(rect.top, rect.bottom, rect.left, rect.right) for rect in rects]
+    else:
+        spans = [(rect.left, rect.right, rect.top, rect.bottom) for rect in rects]
+    # Compress coordinates to the rect edges: the union is exact in these cells
+    across = sorted({value for span in spans for value in span[:2]})
+    along = sorted({value for span in spans for value in span[2:]})
+    across_index = {value: i for i, value in enumerate(across)}
+    along_index = {value: i for i, value in enumerate(along)}
+    covered = [0] * (len(along) - 1)  # Bitmask per compressed row, like OccupancyGrid
+    for low, high, start, end in spans:
+        mask = ((1 << (across_index[high] - across_index[low])) - 1) << across_index[low]
+        for row in range(along_index[start], along_index[end]):
+            covered[row] |= mask
+
+    # Split each row into maximal runs; a run spanning the same cells as one in
+    # the row before extends that rect instead of starting a new one
+    pieces: List[List[int]] = []
+    open_runs: Dict[Tuple[int, int], List[int]] = {}
+    for row, bits in enumerate(covered):
+        next_open = {}
+        while bits:
+            first = (bits & -bits).bit_length() - 1
+            run = bits >> first
+            length = (run ^ (run + 1)).bit_length() - 1
+            bits &= ~(((1 << length) - 1) << first)
+            key = (first, first + length)
+            piece = open_runs.get(key)
+            if piece is None:
+                piece = [across[first], across[first + length], along[row], along[row + 1]]
+                pieces.append(piece)
+            else:
+                piece[3] = along[row + 1]
+            next_open[key] = piece
+        open_runs = next_open
+
+    if transpose:
+        return [pygame.Rect(left, top, right - left, bottom - top) for top, bottom, left, right in pieces]
+    return [pygame.Rect(left, top, right - left, bottom - top) for left, right, top, bottom in pieces]
+
+def merge_rects(rects: List[pygame.Rect]) -> List[pygame.Rect]:
+    """Cover exactly the same area as rects with as few rects as this finds.
+
+    Rects that overlap or touch are grouped, and each group's union is
+    decomposed into non-overlapping rects on a grid compressed to the
+    group's own edges, once in rows and once in columns. Crossing rects can
+    need more pieces than they started with; such a group instead only
+    loses the rects lying inside another one, so the count never goes up.
+    """
+    # Group by overlap or shared edges: sweep left to right, comparing each
+    # rect only with those whose horizontal extent it reaches
+    parent = list(range(len(rects)))
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    active: List[int] = []
+    for i in sorted(range(len(rects)), key=lambda i: rects[i].left):
+        rect = rects[i]
+        active = [j for j in active if rects[j].right >= rect.left]
+        for j in active:
+            other = rects[j]
+            if rect.top <= other.bottom and other.top <= rect.bottom:
+                parent[find(i)] = find(j)
+        active.append(i)
+    groups: Dict[int, List[pygame.Rect]] = {}
+    for i, rect in enumerate(rects):
+        groups.setdefault(find(i), []).append(rect)
+
+    merged = []
+    for group in groups.values():
+        if len(group) == 1:
+            merged.append(pygame.Rect(group[0]))
+            continue
+        by_rows = _decompose(group, False)
+        by_columns = _decompose(group, True)
+        best = by_rows if len(by_rows) <= len(by_columns) else by_columns
+        if len(best) > len(group):
+            # Keep the originals, less any inside another (the first of equal ones stays)
+            best = [pygame.Rect(rect) for i, rect in enumerate(group)
+                    if not any(other.contains(rect) and (other != rect or j < i)
+                               for j, other in enumerate(group) if j != i)]
+        merged.extend(best)
+    return merged
+
+class WallIndex:
+    """Uniform grid over a room's static walls.
+
+    Collision checks only look at the walls in the cells a rect overlaps, so
+    their cost stays flat as rooms get more obstacles.
+    """
+    def __init__(self, walls: List[pygame.Rect], cell_size: int = 128):
+        self.walls = walls
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[pygame.Rect]] = {}
+        for wall in walls:
+            for cx in range(wall.left // cell_size, (wall.right - 1) // cell_size + 1):
+                for cy in range(wall.top // cell_size, (wall.bottom - 1) // cell_size + 1):
+                    self.cells.setdefault((cx, cy), []).append(wall)
+
+    def _cells_for(self, rect: pygame.Rect) -> List[Tuple[int, int]]:
+        size = self.cell_size
+        return [(cx, cy)
+                for cx in range(rect.left // size, (rect.right - 1) // size + 1)
+                for cy in range(rect.top // size, (rect.bottom - 1) // size + 1)]
+
+    def collides(self, rect: pygame.Rect) -> bool:
+        for cell in self._cells_for(rect):
+            walls = self.cells.get(cell)
+            if walls and rect.collidelist(walls) != -1:
+                return True
+        return False
+
+    def nearby(self, rect: pygame.Rect) -> List[pygame.Rect]:
+        """Walls sharing a cell with rect (a superset of the ones it touches)."""
+        found = {}
+        for cell in self._cells_for(rect):
+            for wall in self.cells.get(cell, ()):
+                found[id(wall)] = wall
+        return list(found.values())
+
+    def line_of_sight(self, start: Tuple[float, float], end: Tuple[float, float]) -> bool:
+        """True if no wall crosses the segment from start to end."""
+        bounds = pygame.Rect(min(start[0], end[0]), min(start[1], end[1]),
+                             abs(end[0] - start[0]) + 1, abs(end[1] - start[1]) + 1)
+        for wall in self.nearby(bounds):
+            if wall.clipline(start, end):
+                return False
+        return True
+
+    def raycast(self, start: Tuple[float, float], direction: Tuple[float, float],
+                max_distance: float, radius: float = 0.0) -> float:
+        """Distance along a ray from start until a square body of half-size
+        radius first overlaps a wall, or max_distance if it never does.
+
+        Each wall is grown by radius (so the body shrinks to a point) and
+        intersected with the ray by the slab method.
+        """
+        x, y = start
+        dx, dy = direction
+        end_x = x + dx * max_distance
+        end_y = y + dy * max_distance
+        bounds = pygame.Rect(min(x, end_x) - radius - 1, min(y, end_y) - radius - 1,
+                             abs(end_x - x) + radius * 2 + 2, abs(end_y - y) + radius * 2 + 2)
+        hit = max_distance
+        for wall in self.nearby(bounds):
+            near, far = 0.0, hit
+            for origin, step, low, high in ((x, dx, wall.left - radius, wall.right + radius),
+                                            (y, dy, wall.top - radius, wall.bottom + radius)):
+                if abs(step) < 1e-9:
+                    # Parallel to this slab: inside it throughout or never
+                    if not low < origin < high:
+                        break
+                    continue
+                t_low = (low - origin) / step
+                t_high = (high - origin) / step
+                if t_low > t_high:
+                    t_low, t_high = t_high, t_low
+                near = max(near, t_low)
+                far = min(far, t_high)
+                if near >= far:
+                    break
+            else:
+                hit = near
+        return hit
+
+class OccupancyGrid:
+    """Free space of a room, built once from its walls.
+
+    Each row of cells is an int bitmask (bit = column, set = blocked), so
+    widening the walls to fit a body of a given size is a handful of shifts
+    per row. Answers "random free spot" and "nearest free spot" for a size
+    without testing any walls, however cluttered the room is.
+    """
+    def __init__(self, width: int, height: int, walls: List[pygame.Rect], cell_size: int = 16):
+        self.cell_size = cell_size
+        self.cols = -(-width // cell_size)
+        self.rows = -(-height // cell_size)
+        self.full_row = (1 << self.cols) - 1
+        self.blocked_rows = [0] * self.rows
+        for wall in walls:
+            left = max(0, wall.left // cell_size)
+            right = min(self.cols - 1, (wall.right - 1) // cell_size)
+            top = max(0, wall.top // cell_size)
+            bottom = min(self.rows - 1, (wall.bottom - 1) // cell_size)
+            if left > right or top > bottom:
+                continue
+            mask = ((1 << (right - left + 1)) - 1) << left
+            for row in range(top, bottom + 1):
+                self.blocked_rows[row] |= mask
+        self._free_rows: Dict[int, List[int]] = {}
+        self._free_counts: Dict[Tuple[int, int], Tuple[List[int], List[int], int]] = {}
+
+    def _radius(self, size: float) -> int:
+        # Cells a body of this size covers on each side of its center cell
+        return max(0, ceil(size / (2 * self.cell_size) - 0.5))
+
+    def free_rows(self, size: float) -> List[int]:
+        """Row bitmasks of cells where a size x size body centered on the cell fits."""
+        radius = self._radius(size)
+        if radius not in self._free_rows:
+            # Out of bounds counts as blocked, so bodies never poke out of the room
+            edge = ((1 << radius) - 1) | (((1 << radius) - 1) << (self.cols - radius))
+            widened = []
+            for row in self.blocked_rows:
+                grown = row | edge
+                for shift in range(1, radius + 1):
+                    grown |= (row << shift) | (row >> shift)
+                widened.append(grown & self.full_row)
+            free = []
+            for row in range(self.rows):
+                if row < radius or row >= self.rows - radius:
+                    free.append(0)
+                    continue
+                grown = 0
+                for other in range(row - radius, row + radius + 1):
+                    grown |= widened[other]
+                free.append(~grown & self.full_row)
+            self._free_rows[radius] = free
+        return self._free_rows[radius]
+
+    def cell_center(self, col: int, row: int) -> Tuple[int, int]:
+        return col * self.cell_size + self.cell_size // 2, row * self.cell_size + self.cell_size // 2
+
+    def is_free(self, x: float, y: float, size: float) -> bool:
+        col = int(x // self.cell_size)
+        row = int(y // self.cell_size)
+        if not (0 <= col < self.cols and 0 <= row < self.rows):
+            return False
+        return bool(self.free_rows(size)[row] >> col & 1)
+
+    def random_free_position(self, size: float, rng, margin: int = 0) -> Optional[Tuple[int, int]]:
+        """Uniformly random free cell center at least margin pixels from the room edge."""
+        margin_cells = -(-margin // self.cell_size)
+        key = (self._radius(size), margin_cells)
+        if key not in self._free_counts:
+            column_mask = self.full_row & ~((1 << margin_cells) - 1) & ((1 << max(0, self.cols - margin_cells)) - 1)
+            rows = []
+            totals = []
+            total = 0
+            for row, free in enumerate(self.free_rows(size)):
+                if margin_cells <= row < self.rows - margin_cells and free & column_mask:
+                    total += (free & column_mask).bit_count()
+                    rows.append(row)
+                    totals.append(total)
+            self._free_counts[key] = (rows, totals, column_mask)
+        rows, totals, column_mask = self._free_counts[key]
+        if not totals:
+            return None
+
+        # Pick the n-th free cell: bisect for the row, then halve the row mask
+        n = rng.randrange(totals[-1])
+        index = bisect_right(totals, n)
+        n -= totals[index - 1] if index else 0
+        row = rows[index]
+        mask = self.free_rows(size)[row] & column_mask
+        low, width = 0, self.cols
+        while width > 1:
+            half = width // 2
+            count = (mask >> low & ((1 << half) - 1)).bit_count()
+            if n < count:
+                width = half
+            else:
+                n -= count
+                low += half
+                width -= half
+        return self.cell_center(low, row)
+
+    def nearest_free_position(self, x: float, y: float, size: float) -> Optional[Tuple[int, int]]:
+        """Closest free cell center to (x, y), scanning square rings of cells outward."""
+        free_rows = self.free_rows(size)
+        col = min(max(int(x // self.cell_size), 0), self.cols - 1)
+        row = min(max(int(y // self.cell_size), 0), self.rows - 1)
+        for distance in range(max(self.cols, self.rows)):
+            best = None
+            left = max(0, col - distance)
+            window = (1 << (min(self.cols - 1, col + distance) - left + 1)) - 1
+            for other in range(max(0, row - distance), min(self.rows, row + distance + 1)):
+                found = free_rows[other] >> left & window
+                while found:
+                    bit = found & -found
+                    found ^= bit
+                    center = self.cell_center(left + bit.bit_length() - 1, other)
+                    score = (center[0] - x) ** 2 + (center[1] - y) ** 2
+                    if best is None or score < best[0]:
+                        best = (score, center)
+            if best:
+                return best[1]
+        return None
+
+# Octant transforms for shadowcasting: (xx, xy, yx, yy)
+OCTANTS = [(1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+           (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1)]
+
+class VisibilityMap:
+    """What the player can see in a room, by recursive shadowcasting over the
+    occupancy grid's wall cells.
+
+    Each result is a list of row bitmasks (bit = column, set = visible), the
+    same layout as OccupancyGrid, and is cached per view cell of the player:
+    standing still or walking back over cells already seen costs nothing.
+    View cells are coarser than the grid and see from their center, which
+    halves how often a walking player needs a new result.
+    """
+    def __init__(self, occupancy: OccupancyGrid, radius: int = 512, view_cell: int = 32, cache_size: int = 256):
+        self.occupancy = occupancy
+        self.radius = -(-radius // occupancy.cell_size)  # In grid cells
+        self.view_cell = view_cell
+        self.cache_size = cache_size
+        self.cache: 'OrderedDict[Tuple[int, int], List[int]]' = OrderedDict()
+        self.cell: Optional[Tuple[int, int]] = None    # View cell the player is in
+        self.origin: Optional[Tuple[int, int]] = None  # Grid cell seen from
+        self.visible_rows: List[int] = [0] * occupancy.rows
+        self.computed = 0  # Cache misses, all time
+
+    def update(self, x: float, y: float):
+        """Move the viewpoint to (x, y); recomputes only on entering a view cell not in the cache."""
+        cell = (int(x // self.view_cell), int(y // self.view_cell))
+        if cell == self.cell:
+            return
+        self.cell = cell
+        size = self.occupancy.cell_size
+        self.origin = (int((cell[0] + 0.5) * self.view_cell // size), int((cell[1] + 0.5) * self.view_cell // size))
+        rows = self.cache.get(cell)
+        if rows is None:
+            rows = self._compute(*self.origin)
+            self.cache[cell] = rows
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            self.computed += 1
+        else:
+            self.cache.move_to_end(cell)
+        self.visible_rows = rows
+
+    def sees(self, x: float, y: float) -> bool:
+        """True if the point is lit from the current viewpoint."""
+        col = int(x // self.occupancy.cell_size)
+        row = int(y // self.occupancy.cell_size)
+        if not (0 <= col < self.occupancy.cols and 0 <= row < self.occupancy.rows):
+            return False
+        return bool(self.visible_rows[row] >> col & 1)
+
+    def has_line_of_sight(self, x: float, y: float, walls: WallIndex) -> bool:
+        """Whether (x, y) and the viewpoint see each other. A bit test inside the
+        visibility radius; past it, falls back to walls.line_of_sight."""
+        if self.origin is None:
+            return False
+        dcol = int(x // self.occupancy.cell_size) - self.origin[0]
+        drow = int(y // self.occupancy.cell_size) - self.origin[1]
+        # The same circle _compute lights; the square's corners were never computed
+        if dcol * dcol + drow * drow <= self.radius * self.radius:
+            return self.sees(x, y)
+        return walls.line_of_sight((x, y), self.occupancy.cell_center(*self.origin))
+
+    def _compute(self, col: int, row: int) -> List[int]:
+        visible = [0] * self.occupancy.rows
+        if 0 <= col < self.occupancy.cols and 0 <= row < self.occupancy.rows:
+            visible[row] |= 1 << col
+            for xx, xy, yx, yy in OCTANTS:
+                self._cast(visible, col, row, 1, 1.0, 0.0, xx, xy, yx, yy)
+        return visible
+
+    def _cast(self, visible: List[int], cx: int, cy: int, distance: int, start: float, end: float,
+              xx: int, xy: int, yx: int, yy: int):
+        # One octant, row by row outward; recurses around each wall run it meets
+        if start < end:
+            return
+        blocked_rows = self.occupancy.blocked_rows
+        cols = self.occupancy.cols
+        rows = self.occupancy.rows
+        radius = self.radius
+        radius_sq = radius * radius
+        new_start = start
+        for j in range(distance, radius + 1):
+            dy = -j
+            blocked = False
+            left_scale = 1 / (dy + 0.5)
+            right_scale = 1 / (dy - 0.5)
+            row_x = cx + dy * xy
+            row_y = cy + dy * yy
+            # Start at the first cell whose right edge is inside the beam
+            for dx in range(max(-j, ceil(start * (dy - 0.5) - 0.5)), 1):
+                left_slope = (dx - 0.5) * left_scale
+                right_slope = (dx + 0.5) * right_scale
+                if end > left_slope:
+                    break
+                x = row_x + dx * xx
+                y = row_y + dx * yx
+                inside = 0 <= x < cols and 0 <= y < rows
+                if inside and dx * dx + dy * dy <= radius_sq:
+                    visible[y] |= 1 << x
+                wall = not inside or blocked_rows[y] >> x & 1
+                if blocked:
+                    if wall:
+                        new_start = right_slope
+                    else:
+                        blocked = False
+                        start = new_start
+                elif wall and j < radius:
+                    blocked = True
+                    self._cast(visible, cx, cy, j + 1, start, left_slope, xx, xy, yx, yy)
+                    new_start = right_slope
+            if blocked:
+                break
+
+class NeighbourGrid:
+    """Uniform grid over moving bodies (anything with x and y), rebuilt every tick.
+
+    A rebuild is one dict append per body and a query looks at the 3x3 cells
+    around a point, so finding every body's neighbours stays near linear in
+    the number of bodies as long as cells are no smaller than the query radius.
+    """
+    def __init__(self, cell_size: int = 64):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], list] = {}
+
+    def rebuild(self, bodies):
+        size = self.cell_size
+        cells: Dict[Tuple[int, int], list] = {}
+        for body in bodies:
+            cells.setdefault((int(body.x // size), int(body.y // size)), []).append(body)
+        self.cells = cells
+
+    def near(self, x: float, y: float) -> list:
+        """Bodies in the cells around (x, y): everyone within cell_size, and some further."""
+        col = int(x // self.cell_size)
+        row = int(y // self.cell_size)
+        found = []
+        for other_col in (col - 1, col, col + 1):
+            for other_row in (row - 1, row, row + 1):
+                bodies = self.cells.get((other_col, other_row))
+                if bodies:
+                    found.extend(bodies)
+        return found
+
+@dataclass(eq=False)
+class Trigger:
+    """An axis-aligned trigger volume; kind and payload say what it is for."""
+    left: float
+    top: float
+    right: float
+    bottom: float
+    kind: str
+    payload: object = None
+
+class TriggerIndex:
+    """A room's trigger volumes (doors, stairs, pickups) in a uniform grid,
+    tested against one moving body.
+
+    update() only looks at the triggers in the cells under the body and
+    compares plain numbers, so a frame allocates no rects. on_enter and
+    on_exit fire when the body starts or stops overlapping a trigger, after
+    the scan, so callbacks may add or remove triggers.
+    """
+    def __init__(self, cell_size: int = 128):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[Trigger]] = {}
+        self.triggers: List[Trigger] = []
+        self.inside: List[Trigger] = []  # Triggers the body overlapped at the last update
+
+    def _keys(self, trigger: Trigger) -> List[Tuple[int, int]]:
+        size = self.cell_size
+        return [(cx, cy)
+                for cx in range(int(trigger.left // size), int((trigger.right - 1) // size) + 1)
+                for cy in range(int(trigger.top // size), int((trigger.bottom - 1) // size) + 1)]
+
+    def add(self, trigger: Trigger) -> Trigger:
+        self.triggers.append(trigger)
+        for key in self._keys(trigger):
+            self.cells.setdefault(key, []).append(trigger)
+        return trigger
+
+    def remove(self, trigger: Trigger):
+        self.triggers.remove(trigger)
+        for key in self._keys(trigger):
+            self.cells[key].remove(trigger)
+        if trigger in self.inside:
+            self.inside.remove(trigger)
+
+    def find(self, kind: str, payload: object = None) -> Optional[Trigger]:
+        for trigger in self.triggers:
+            if trigger.kind == kind and trigger.payload is payload:
+                return trigger
+        return None
+
+    def update(self, x: float, y: float, half: float, on_enter: Callable[[Trigger], None],
+               on_exit: Optional[Callable[[Trigger], None]] = None):
+        """Move the body, a square of half-size half centered on (x, y)."""
+        left = x - half
+        top = y - half
+        right = x + half
+        bottom = y + half
+        size = self.cell_size
+        touching = None
+        for cx in range(int(left // size), int(right // size) + 1):
+            for cy in range(int(top // size), int(bottom // size) + 1):
+                for trigger in self.cells.get((cx, cy), ()):
+                    if trigger.left < right and left < trigger.right and trigger.top < bottom and top < trigger.bottom:
+                        if touching is None:
+                            touching = [trigger]
+                        elif trigger not in touching:
+                            touching.append(trigger)
+        if touching is None:
+            if not self.inside:
+                return  # The usual frame: nothing near, nothing to leave
+            touching = []
+
+        exited = [trigger for trigger in self.inside if trigger not in touching]
+        entered = [trigger for trigger in touching if trigger not in self.inside]
+        self.inside = touching
+        if on_exit is not None:
+            for trigger in exited:
+                on_exit(trigger)
+        for trigger in entered:
+            on_enter(trigger)